@@ -1,8 +1,9 @@
 import streamlit as st
 import logging
 import os
-import sys
-from datetime import datetime, timezone, timedelta
+import re
+import importlib
+from types import MappingProxyType
 from typing import Dict, Any, Optional
 import json
 from dotenv import load_dotenv
@@ -15,29 +16,16 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Pages
+# Configure logging before the project modules run their own basicConfig
+from logging_config import configure_logging
+configure_logging()
+logger = logging.getLogger(__name__)
+
+# Core components; page modules are imported lazily through _view()
 from automated_trader import AutomatedTrader
 from bybit_client import BybitClient
+from db import db_manager
 from engine import TradingEngine
-from pages.dashboard import show_dashboard
-from pages.positions import show_positions
-from pages.orders import show_orders
-from pages.signals import show_signals
-from pages.portfolio import show_portfolio
-from pages.automation import show_automation
-from pages.logs import show_logs
-from pages.ml import show_ml
-
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('app.log', encoding='utf-8'),
-        logging.StreamHandler(sys.stdout)
-    ]
-)
-logger = logging.getLogger(__name__)
 
 # Custom CSS
 CSS = """
@@ -92,68 +80,105 @@ CSS = """
     }
     </style>
 """
-st.markdown(CSS, unsafe_allow_html=True)
+@st.cache_data(show_spinner=False)
+def _minify_css(css: str) -> str:
+    """Collapse whitespace once per server so each rerun ships the smallest payload."""
+    return re.sub(r"\s*([{};:,>])\s*", r"\1", re.sub(r"\s+", " ", css)).strip()
+
+st.markdown(_minify_css(CSS), unsafe_allow_html=True)
+
+SESSION_DEFAULTS = MappingProxyType({
+    'trading_mode': 'virtual',
+    'selected_symbol': 'BTCUSDT',
+    'position_size': 0.01,
+    'leverage': 10,
+    'log_level': 'info',
+})
 
 def init_session_state():
     """Initialize session state with default values."""
-    defaults = {
-        'trading_mode': 'virtual',
-        'selected_symbol': 'BTCUSDT',
-        'position_size': 0.01,
-        'leverage': 10,
-        'log_level': 'info',
-        'last_refresh': datetime.now().timestamp()
-    }
-    for key, default_value in defaults.items():
+    # Rehydrate the trading mode from the URL so a reload or reconnect keeps it
+    if "trading_mode" not in st.session_state and st.query_params.get("mode") in ("virtual", "real"):
+        st.session_state.trading_mode = st.query_params["mode"]
+    for key, default_value in SESSION_DEFAULTS.items():
         if key not in st.session_state:
             st.session_state[key] = default_value
             logger.info(f"Initialized session_state.{key} = {default_value}")
 
+@st.cache_resource(show_spinner=False)
+def _has_api_credentials() -> bool:
+    """Parse .env and check the Bybit credentials once per server instead of every rerun."""
+    load_dotenv()
+    api_key = os.getenv("BYBIT_API_KEY")
+    api_secret = os.getenv("BYBIT_API_SECRET")
+    return bool(api_key and api_secret and api_key != "F7aQeUkd3obyUSDeNJ" and api_secret != "A8WNJSiQodExiy2U2GsKTp2Na5ytSwBlK7iD")
+
+@st.cache_resource(show_spinner=False)
+def _logo_bytes() -> bytes:
+    """Read the sidebar logo once per server; Streamlit serves it through its media endpoint."""
+    with open("logo.png", "rb") as f:
+        return f.read()
+
+@st.cache_resource(show_spinner=False)
+def _view(name: str):
+    """Import a page module on first navigation instead of at startup."""
+    return importlib.import_module(f"pages.{name}")
+
+@st.cache_resource(show_spinner=False)
+def _create_components():
+    """
+    Build one engine/client/trader set for the whole server. BybitClient picks its
+    account from the environment, not the sidebar mode, so one trader covers both.
+    """
+    engine = TradingEngine()
+    client = BybitClient()
+    automated_trader = AutomatedTrader(engine, client)
+    return db_manager, engine, client, automated_trader
+
+@st.cache_resource(show_spinner=False)
+def _start_trader_once(_automated_trader) -> bool:
+    """Start the background trading pipeline once per server, surviving reruns and hot-reloads."""
+    # Opt-in: the trader places orders as soon as it runs
+    if os.getenv("AUTO_START_TRADER", "false").lower() != "true":
+        return False
+    return _automated_trader.start()
+
 def init_components(trading_mode: str):
     """Initialize components with the current trading mode."""
     try:
-        from db import db_manager
-        from engine import TradingEngine
-        from bybit_client import BybitClient
-        from automated_trader import AutomatedTrader
-
-        db_manager_instance = db_manager
-        engine = TradingEngine()
-        client = BybitClient()  # Assume BybitClient handles trading_mode internally
-        automated_trader = AutomatedTrader(engine, client)
+        db_manager_instance, engine, client, automated_trader = _create_components()
 
         # Start trading loop in background
-        import threading
-        threading.Thread(
-            target=automated_trader._trading_loop,
-            args=(db_manager_instance, client, None),  # Pass container if UI logging
-            daemon=True
-        ).start()
+        _start_trader_once(automated_trader)
 
         return db_manager_instance, engine, client, automated_trader
 
-    except ImportError as e:
-        logger.error(f"Failed to import modules: {e}")
-        st.error(f"🚨 Failed to import modules: {e}")
-        return None, None, None, None
     except Exception as e:
         logger.error(f"Failed to initialize components: {e}")
         st.error(f"🚨 Failed to initialize components: {e}")
         return None, None, None, None
 
+@st.fragment(run_every=1)
+def watch_trader_updates(automated_trader):
+    """Rerun the app only when the trading loop has recorded new trades since this session last looked."""
+    count = automated_trader.update_count
+    seen = st.session_state.get("trader_update_count")
+    st.session_state.trader_update_count = count
+    if seen is None or count == seen:
+        return
+    logger.info(f"Refreshing dashboard after {count - seen} trader update(s)")
+    st.rerun(scope="app")
+
 def main():
     try:
         # Initialize session state
         init_session_state()
 
         # Check for API credentials
-        load_dotenv()
-        api_key = os.getenv("BYBIT_API_KEY")
-        api_secret = os.getenv("BYBIT_API_SECRET")
-        has_api_credentials = bool(api_key and api_secret and api_key != "F7aQeUkd3obyUSDeNJ" and api_secret != "A8WNJSiQodExiy2U2GsKTp2Na5ytSwBlK7iD")
+        has_api_credentials = _has_api_credentials()
 
         # Sidebar
-        st.sidebar.image("logo.png", width=150)
+        st.sidebar.image(_logo_bytes(), width=150)
         st.sidebar.title("AlgoTrader")
 
         # Trading mode selection
@@ -163,14 +188,31 @@ def main():
         else:
             st.sidebar.warning("Real mode disabled: Missing or default API credentials in .env")
 
-        # Set selectbox index based on current trading_mode
-        selected_mode = st.sidebar.selectbox(
-            "Trading Mode",
-            options=mode_options,
-            index=mode_options.index(st.session_state.trading_mode.capitalize()) if st.session_state.trading_mode.capitalize() in mode_options else 0,
-            key="trading_mode_select"
-        )
+        # Sidebar controls are submitted together so picking several values costs one rerun
+        with st.sidebar.form("controls"):
+            # Set selectbox index based on current trading_mode
+            selected_mode = st.selectbox(
+                "Trading Mode",
+                options=mode_options,
+                index=mode_options.index(st.session_state.trading_mode.capitalize()) if st.session_state.trading_mode.capitalize() in mode_options else 0,
+                key="trading_mode_select"
+            )
+
+            # Sidebar navigation
+            page = st.radio(
+                "Navigation",
+                ["Dashboard", "Positions", "Orders", "Signals", "Portfolio", "Automation", "ML", "Logs"],
+                index=0
+            )
+
+            # Auto-refresh toggle
+            auto_refresh = st.checkbox("Auto-refresh on trader updates", value=True)
+
+            st.form_submit_button("Apply")
+
         st.session_state.trading_mode = "virtual" if selected_mode == "Virtual" else "real"
+        if st.query_params.get("mode") != st.session_state.trading_mode:
+            st.query_params["mode"] = st.session_state.trading_mode
         logger.info(f"Selected trading_mode: {st.session_state.trading_mode}")
 
         # Initialize components with current trading mode
@@ -180,44 +222,31 @@ def main():
             st.error("🚨 Failed to initialize application components")
             return
 
-        # Sidebar navigation
-        page = st.sidebar.radio(
-            "Navigation",
-            ["Dashboard", "Positions", "Orders", "Signals", "Portfolio", "Automation", "ML", "Logs"],
-            index=0
-        )
-
-        # Auto-refresh toggle
-        auto_refresh = st.sidebar.checkbox("Auto-refresh (30s)", value=True)
-
         # Display selected page
         try:
             if page == "Dashboard":
-                show_dashboard(db, engine, client, st.session_state.trading_mode)
+                _view("dashboard").show_dashboard(db, engine, client, st.session_state.trading_mode)
             elif page == "Positions":
-                show_positions(db, engine, client, st.session_state.trading_mode)
+                _view("positions").show_positions(db, engine, client, st.session_state.trading_mode)
             elif page == "Orders":
-                show_orders(db, engine, client, st.session_state.trading_mode)
+                _view("orders").show_orders(db, engine, client, st.session_state.trading_mode)
             elif page == "Signals":
-                show_signals(db, engine, client, st.session_state.trading_mode)
+                _view("signals").show_signals(db, engine, client, st.session_state.trading_mode)
             elif page == "Portfolio":
-                show_portfolio(db, engine, client, st.session_state.trading_mode)
+                _view("portfolio").show_portfolio(db, engine, client, st.session_state.trading_mode)
             elif page == "Automation":
-                show_automation(automated_trader, db, engine, client, st.session_state.trading_mode)
+                _view("automation").show_automation(automated_trader, db, engine, client, st.session_state.trading_mode)
             elif page == "ML":
-                show_ml(db, engine, client, st.session_state.trading_mode)
+                _view("ml").show_ml(db, engine, client, st.session_state.trading_mode)
             elif page == "Logs":
-                show_logs()
+                _view("logs").show_logs()
         except Exception as e:
             logger.error(f"Error in page {page}: {e}")
             st.error(f"🚨 Error loading {page}: {str(e)}")
 
         # Auto-refresh implementation
         if auto_refresh:
-            current_time = datetime.now().timestamp()
-            if current_time - st.session_state.last_refresh >= 30:
-                st.session_state.last_refresh = current_time
-                st.rerun()
+            watch_trader_updates(automated_trader)
 
     except Exception as e:
         logger.error(f"Critical error in main: {e}")
@@ -1,43 +1,154 @@
+import asyncio
+import hashlib
+import math
 import os
+import random
 import threading
 import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 import logging
+import numpy as np
+
+# Queue-backed logging before the project modules run their own basicConfig, so the
+# trading loop only enqueues records and never blocks on app.log writes
+from logging_config import configure_logging
+configure_logging()
+
 from bybit_client import BybitClient
-from ml import MLFilter
+from ml import get_ml
+from utils import TTLCache
 from dotenv import load_dotenv
 
+try:
+    from pybit.unified_trading import WebSocket
+except ImportError:  # No kline stream available; the trading loop falls back to REST polling
+    WebSocket = None
+
 load_dotenv()
-logging.basicConfig(
-    level=logging.INFO,
-    filename="app.log",
-    filemode="a",
-    format="%(asctime)s - %(levelname)s - %(message)s",
-    encoding="utf-8"
-)
 logger = logging.getLogger(__name__)
 
+BUY_SIDES = frozenset(("buy", "Buy", "BUY"))
+INTERVAL_SECONDS = {"D": 86_400, "W": 604_800, "M": 2_592_000}  # Bybit's non-minute kline intervals
+RECENT_SIGNALS_MAX = 1024
+KEEPALIVE_INTERVAL = 30  # seconds; well inside Bybit's ~75s idle keep-alive timeout
+PIPELINE_DEPTH = 256  # max batches buffered between trading pipeline stages
+CANDLE_CLOSE_GRACE = 30  # seconds past the expected close before a silent stream is treated as stale
+
+class Signal:
+    """Typed view of an engine signal dict, converted once at the loop boundary."""
+
+    __slots__ = ("symbol", "side", "entry", "sl", "tp", "score", "is_buy", "raw")
+
+    def __init__(self, raw: Dict):
+        self.raw = raw
+        self.symbol = raw.get("symbol")
+        self.side = raw.get("side")
+        self.score = raw.get("score", 0.0)
+        try:
+            self.entry = float(raw.get("entry", 0))
+            self.sl = float(raw.get("sl", 0))
+            self.tp = float(raw.get("tp", 0))
+            self.is_buy = raw["side"] in BUY_SIDES
+        except (ValueError, TypeError, KeyError) as e:
+            logger.error("Error validating SL/TP: %s", e)
+            # NaN fails every validation comparison, so the signal is rejected
+            self.entry = self.sl = self.tp = math.nan
+            self.is_buy = False
+
+class SignalBuffer:
+    """Reusable column arrays (SoA) that a pass's signals are staged into for vectorized validation."""
+
+    __slots__ = ("entry", "sl", "tp", "is_buy")
+
+    def __init__(self, capacity: int = 64):
+        self._allocate(capacity)
+
+    def _allocate(self, capacity: int):
+        self.entry = np.empty(capacity, dtype=np.float64)
+        self.sl = np.empty(capacity, dtype=np.float64)
+        self.tp = np.empty(capacity, dtype=np.float64)
+        self.is_buy = np.empty(capacity, dtype=bool)
+
+    def load(self, signals: List[Signal]):
+        n = len(signals)
+        if n > len(self.entry):
+            self._allocate(max(n, 2 * len(self.entry)))
+        entry, sl, tp, is_buy = self.entry, self.sl, self.tp, self.is_buy
+        for i, signal in enumerate(signals):
+            entry[i] = signal.entry
+            sl[i] = signal.sl
+            tp[i] = signal.tp
+            is_buy[i] = signal.is_buy
+        return entry[:n], sl[:n], tp[:n], is_buy[:n]
+
+VALIDATE_AND_SIZE_TEMPLATE = """
+def validate_and_size(entry, sl, tp, is_buy, account_balance):
+    sl_distance = np.abs(entry - sl)
+    mask = (
+        (entry > 0) & (sl > 0) & (tp > 0)
+        & (sl_distance >= {min_sl}) & (sl_distance <= {max_sl})
+        & np.where(is_buy, (tp > entry) & (entry > sl), (tp < entry) & (entry < sl))
+    )
+    qty = np.zeros_like(entry)
+    np.divide(account_balance * {risk}, sl_distance, out=qty, where=mask & (sl_distance > 0))
+    return mask, qty
+"""
+
+def _literal(value: float) -> str:
+    return repr(value) if math.isfinite(value) else f"float({str(value)!r})"
+
+def _compile_validate_and_size(min_sl_points: float, max_sl_points: float, risk_per_trade: float):
+    """
+    Build validate_and_size(entry, sl, tp, is_buy, account_balance) -> (mask, qty) with the
+    instance's SL bounds and risk inlined as literals, so the per-pass code does no
+    attribute lookups for configuration that is fixed for the trader's lifetime.
+    """
+    source = VALIDATE_AND_SIZE_TEMPLATE.format(
+        min_sl=_literal(min_sl_points),
+        max_sl=_literal(max_sl_points),
+        risk=_literal(risk_per_trade)
+    )
+    namespace = {"np": np}
+    exec(compile(source, "<validate_and_size>", "exec"), namespace)
+    return namespace["validate_and_size"]
+
 class AutomatedTrader:
     def __init__(self, engine, client: BybitClient, risk_per_trade: float = 0.01):
         self.is_running = False
         self.threads = []
         self.start_time = None
+        self._start_ns: Optional[int] = None
+        self._stop_ns: Optional[int] = None
         self.engine = engine
         self.client = client
-        self.ml_filter = MLFilter() if os.getenv("ML_ENABLED", "true").lower() == "true" else None
+        self.ml_filter = get_ml() if os.getenv("ML_ENABLED", "true").lower() == "true" else None
         self.risk_per_trade = risk_per_trade
         self.min_sl_points = float(os.getenv("MIN_SL_POINTS", "10"))
         self.max_sl_points = float(os.getenv("MAX_SL_POINTS", "100"))
-        self.stats_lock = threading.Lock()
-        self.stats = {
-            "signals_generated": 0,
-            "trades_executed": 0,
-            "successful_trades": 0,
-            "failed_trades": 0,
-            "success_rate": 0.0,
-            "uptime": "0:00:00"
-        }
+        self._validate_and_size_batch = _compile_validate_and_size(
+            self.min_sl_points, self.max_sl_points, self.risk_per_trade
+        )
+        self.base_poll_interval = float(os.getenv("POLL_INTERVAL", "1"))
+        self.max_poll_interval = float(os.getenv("MAX_POLL_INTERVAL", "60"))
+        self.max_workers = int(os.getenv("TRADER_WORKERS", str(min(32, (os.cpu_count() or 4) * 2))))
+        self.poll_intervals: Dict[str, float] = {}
+        self.use_http_batch_api = os.getenv("USE_HTTP_BATCH_API", "true").lower() == "true"
+        self.use_ws_feed = os.getenv("USE_WS_FEED", "true").lower() == "true"
+        self._ws = None
+        self._candle_closes: Dict[str, asyncio.Queue] = {}
+        # Set from stop() so waits on the trading loop's thread end at once
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stop_event: Optional[asyncio.Event] = None
+        self._balance_cache = TTLCache(ttl=float(os.getenv("BALANCE_TTL", "5")))
+        self.signal_dedupe_ttl = float(os.getenv("SIGNAL_DEDUPE_TTL", "30"))
+        # Only touched from the event-loop thread, so no lock is needed
+        self._recent_signals: "OrderedDict[bytes, float]" = OrderedDict()
+        # Bumped per placed trade; every session compares it with the last value it saw
+        self.update_count = 0
+        self._reset_counters()
 
     def start(self) -> bool:
         if self.is_running:
@@ -46,18 +157,21 @@ class AutomatedTrader:
         try:
             self.is_running = True
             self.start_time = datetime.now(timezone.utc)
+            self._start_ns = time.monotonic_ns()
+            self._stop_ns = None
             symbols = os.getenv("SYMBOLS", "BTCUSDT,ETHUSDT,XRPUSDT").split(",")
             interval = os.getenv("INTERVAL", "60")
             strategy = os.getenv("STRATEGY", "MACD")
-            for symbol in symbols:
-                thread = threading.Thread(
-                    target=self._trading_loop,
-                    args=(symbol, interval, strategy),
-                    daemon=True
-                )
-                self.threads.append(thread)
-                thread.start()
-                logger.info(f"Started trading thread for {symbol}")
+            # One thread drives an asyncio loop; each symbol is a task on it
+            thread = threading.Thread(
+                target=asyncio.run,
+                args=(self._run_symbols(symbols, interval, strategy),),
+                daemon=True
+            )
+            self.threads.append(thread)
+            thread.start()
+            self.client.start_monitoring()
+            logger.info(f"Started trading loop for {', '.join(symbols)}")
             logger.info("Automated trading system started")
             return True
         except Exception as e:
@@ -70,165 +184,320 @@ class AutomatedTrader:
             logger.warning("Automation is not running")
             return
         self.is_running = False
+        self._stop_ns = time.monotonic_ns()
+        self.client.stop_monitoring()
+        if self._loop is not None and self._stop_event is not None:
+            try:
+                self._loop.call_soon_threadsafe(self._stop_event.set)
+            except RuntimeError:
+                pass  # The loop already finished
+        if self._ws:
+            self._ws.exit()
+            self._ws = None
         for thread in self.threads:
             if thread.is_alive():
                 thread.join(timeout=5)
         self.threads = []
         logger.info("Automated trading system stopped")
 
-    def _calculate_position_size(self, entry_price: float, stop_loss: float, account_balance: float) -> float:
-        if not entry_price or not stop_loss:
-            return 0.0
-        risk_amount = account_balance * self.risk_per_trade
-        stop_distance = abs(entry_price - stop_loss)
-        return risk_amount / stop_distance if stop_distance > 0 else 0.0
+    def _is_duplicate(self, signal: Dict) -> bool:
+        try:
+            salient = (
+                f"{signal['symbol']}|{signal['side']}|{round(float(signal['entry']), 6)}"
+                f"|{round(float(signal['sl']), 6)}|{round(float(signal['tp']), 6)}"
+            )
+        except (KeyError, ValueError, TypeError):
+            return False  # Let validation reject it
+        key = hashlib.blake2b(salient.encode(), digest_size=8).digest()
+        now = time.monotonic()
+        seen = self._recent_signals.get(key)
+        if seen is not None and now - seen < self.signal_dedupe_ttl:
+            return True
+        self._recent_signals[key] = now
+        self._recent_signals.move_to_end(key)
+        if len(self._recent_signals) > RECENT_SIGNALS_MAX:
+            self._recent_signals.popitem(last=False)
+        return False
+
+    def _next_poll_interval(self, symbol: str, backoff: int) -> float:
+        # Exponential in the number of idle/failed iterations, jittered +/-20% so symbols don't poll in lockstep
+        delay = min(self.max_poll_interval, self.base_poll_interval * 2 ** backoff) * random.uniform(0.8, 1.2)
+        self.poll_intervals[symbol] = delay
+        return delay
+
+    def _start_kline_feed(self, symbols, interval: str):
+        """Subscribe to confirmed kline closes; each close is queued for its symbol's trading loop."""
+        if not self.use_ws_feed or WebSocket is None:
+            return
+        loop = asyncio.get_running_loop()
+        self._candle_closes = {symbol: asyncio.Queue(maxsize=1) for symbol in symbols}
+
+        def enqueue(symbol: str, candle: Dict):
+            try:
+                self._candle_closes[symbol].put_nowait(candle)
+            except asyncio.QueueFull:
+                pass  # A pass is already pending for this symbol
+
+        def on_kline(message: Dict):
+            # Runs on pybit's socket thread; hand off to the event loop
+            symbol = message.get("topic", "").rsplit(".", 1)[-1]
+            for candle in message.get("data", []):
+                if candle.get("confirm") and symbol in self._candle_closes:
+                    loop.call_soon_threadsafe(enqueue, symbol, candle)
 
-    def _validate_sl_tp(self, signal: Dict) -> bool:
         try:
-            entry = float(signal.get("entry", 0))
-            sl = float(signal.get("sl", 0))
-            tp = float(signal.get("tp", 0))
-            
-            if entry <= 0 or sl <= 0 or tp <= 0:
-                logger.error(f"Invalid signal values: entry={entry}, sl={sl}, tp={tp}")
-                return False
-
-            sl_distance = abs(entry - sl)
-            if sl_distance < self.min_sl_points or sl_distance > self.max_sl_points:
-                logger.error(f"Stop loss distance {sl_distance} outside allowed range")
-                return False
-
-            if signal["side"].lower() == "buy":
-                if not (tp > entry > sl):
-                    logger.error("Invalid buy signal: TP must be > entry > SL")
-                    return False
-            else:  # sell
-                if not (tp < entry < sl):
-                    logger.error("Invalid sell signal: TP must be < entry < SL")
-                    return False
+            self._ws = WebSocket(testnet=False, channel_type="linear")
+            self._ws.kline_stream(interval=interval, symbol=symbols, callback=on_kline)
+            logger.info(f"Subscribed to kline.{interval} closes for {', '.join(symbols)}")
+        except Exception as e:
+            logger.error(f"Kline stream unavailable, falling back to polling: {e}")
+            self._ws = None
+            self._candle_closes = {}
 
-            return True
-        except (ValueError, TypeError) as e:
-            logger.error(f"Error validating SL/TP: {e}")
-            return False
+    async def _sleep_unless_stopped(self, delay: float):
+        try:
+            await asyncio.wait_for(self._stop_event.wait(), timeout=delay)
+        except asyncio.TimeoutError:
+            pass
 
-    def _trading_loop(self, symbol: str, interval: str, strategy: str):
+    async def _wait_for_next_pass(self, symbol: str, interval: str, backoff: int):
+        candle_closes = self._candle_closes.get(symbol)
+        if candle_closes is None:
+            await self._sleep_unless_stopped(self._next_poll_interval(symbol, backoff))
+            return
+        # Run as soon as a candle closes; if the stream goes quiet for a whole candle, run a pass anyway.
+        # stop() closes the stream, so the stop event is waited on alongside the next close.
+        candle_seconds = int(interval) * 60 if interval.isdigit() else INTERVAL_SECONDS.get(interval, self.max_poll_interval)
+        timeout = candle_seconds + CANDLE_CLOSE_GRACE
+        self.poll_intervals[symbol] = timeout
+        next_close = asyncio.ensure_future(candle_closes.get())
+        stopped = asyncio.ensure_future(self._stop_event.wait())
+        done, pending = await asyncio.wait({next_close, stopped}, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+        for task in pending:
+            task.cancel()
+        if not done:
+            logger.warning("No %s candle close for %s within %ss; polling instead", interval, symbol, timeout)
+
+    async def _run_symbols(self, symbols, interval: str, strategy: str):
+        # Every blocking engine/client call is dispatched through asyncio.to_thread; give them one
+        # bounded, reused pool rather than the interpreter-sized default. asyncio.run shuts it down.
+        self._loop = asyncio.get_running_loop()
+        self._stop_event = asyncio.Event()
+        self._loop.set_default_executor(
+            ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="trader")
+        )
+        self._start_kline_feed(symbols, interval)
+        # produce (per symbol) -> filter -> execute; bounded queues give backpressure when the broker is slow
+        signal_queue = asyncio.Queue(maxsize=PIPELINE_DEPTH)
+        order_queue = asyncio.Queue(maxsize=PIPELINE_DEPTH)
+        await asyncio.gather(
+            *(self._produce_signals(symbol, interval, strategy, signal_queue) for symbol in symbols),
+            self._filter_signals(signal_queue, order_queue),
+            self._execute_orders(order_queue),
+            self._keep_connection_warm()
+        )
+
+    async def _keep_connection_warm(self):
+        # Between candles the pooled connection would idle out, and the next order would pay a fresh TCP+TLS handshake
+        while self.is_running:
+            await asyncio.to_thread(self.client.ping)
+            for _ in range(KEEPALIVE_INTERVAL):
+                if not self.is_running:
+                    return
+                await asyncio.sleep(1)
+
+    async def _next_item(self, stage_queue: asyncio.Queue):
+        # Wake up periodically so the stage notices stop() even when its queue stays empty
+        while self.is_running:
+            try:
+                return await asyncio.wait_for(stage_queue.get(), timeout=1)
+            except asyncio.TimeoutError:
+                continue
+        return None
+
+    async def _produce_signals(self, symbol: str, interval: str, strategy: str, signal_queue: asyncio.Queue):
         logger.info(f"Automated trading loop started for {symbol} on {interval} with {strategy}")
 
+        # Invariant for the life of the loop; bind once instead of re-resolving every pass
+        trading_mode = "virtual" if self.client.virtual_mode else "real"
+        run_once = self.engine.run_once
+        get_wallet_balance = self.client.get_wallet_balance
+        balance_cache = self._balance_cache
+
+        backoff = 0
         while self.is_running:
             try:
-                trading_mode = "virtual" if self.client.virtual_mode else "real"
-                signals = self.engine.run_once(
-                    trading_mode=trading_mode,
-                    symbol=symbol,
-                    interval=interval,
-                    strategy=strategy
+                # The engine and client are blocking; overlap their round-trips off the event loop
+                signals, wallet = await asyncio.gather(
+                    asyncio.to_thread(
+                        run_once,
+                        trading_mode=trading_mode,
+                        symbol=symbol,
+                        interval=interval,
+                        strategy=strategy
+                    ),
+                    asyncio.to_thread(balance_cache.get_or, "balance", get_wallet_balance),
                 )
-                
-                with self.stats_lock:
-                    self.stats["signals_generated"] += len(signals)
 
-                account_balance = self.client.get_wallet_balance().get("available", 0.0)
+                self._signals_generated += len(signals)
+                if signals:
+                    await signal_queue.put((symbol, signals, wallet.get("available", 0.0)))
+
+                backoff = 0 if signals else min(backoff + 1, 16)
+                await self._wait_for_next_pass(symbol, interval, backoff)
+
+            except Exception as e:
+                logger.error("Error in trading loop for %s: %s", symbol, e)
+                self._failed += 1
+                backoff = min(backoff + 1, 16)
+                await self._sleep_unless_stopped(self._next_poll_interval(symbol, backoff))
+
+    async def _filter_signals(self, signal_queue: asyncio.Queue, order_queue: asyncio.Queue):
+        trading_mode = "virtual" if self.client.virtual_mode else "real"
+        ml_filter = self.ml_filter
+        validate_and_size = self._validate_and_size_batch
+        signal_buffer = SignalBuffer()
 
+        while self.is_running:
+            item = await self._next_item(signal_queue)
+            if item is None:
+                return
+            symbol, signals, account_balance = item
+            # Per-signal logs are interpolated lazily; the cheap ones are skipped outright when filtered
+            debug_enabled = logger.isEnabledFor(logging.DEBUG)
+            info_enabled = logger.isEnabledFor(logging.INFO)
+            try:
+                candidates = []
                 for signal in signals:
-                    # Enhance and validate signal using MLFilter
-                    if self.ml_filter:
-                        try:
-                            signal = self.ml_filter.enhance_signal(signal, trading_mode)
-                            if signal.get("score", 0.0) < 60.0:
-                                logger.info(f"Signal filtered out by ML for {symbol}: score={signal.get('score')}")
-                                with self.stats_lock:
-                                    self.stats["failed_trades"] += 1
-                                continue
-                        except Exception as e:
-                            logger.error(f"MLFilter enhancement error for {symbol}: {e}")
-                            with self.stats_lock:
-                                self.stats["failed_trades"] += 1
+                    # The engine re-emits a standing setup until conditions change; skip repeats
+                    if self._is_duplicate(signal):
+                        if debug_enabled:
+                            logger.debug("Skipping duplicate signal for %s: %s @ %s", symbol, signal.get("side"), signal.get("entry"))
+                        continue
+                    candidates.append(signal)
+
+                # Enhance and validate signals using MLFilter, one batched forward pass per pass
+                if ml_filter and candidates:
+                    try:
+                        scored = await asyncio.to_thread(ml_filter.enhance_batch, candidates, trading_mode)
+                    except Exception as e:
+                        logger.error("MLFilter enhancement error for %s: %s", symbol, e)
+                        self._failed += len(candidates)
+                        scored = []
+                    candidates = []
+                    for signal in scored:
+                        score = signal.get("score", 0.0)
+                        if score < 60.0:
+                            if info_enabled:
+                                logger.info("Signal filtered out by ML for %s: score=%s", symbol, score)
+                            self._failed += 1
                             continue
+                        candidates.append(signal)
 
-                    if not self._validate_sl_tp(signal):
-                        with self.stats_lock:
-                            self.stats["failed_trades"] += 1
-                        continue
+                if not candidates:
+                    continue
 
-                    # Explicitly define price as a float
-                    price = float(signal.get("entry", 0))
-                    if price <= 0:
-                        logger.error(f"Invalid price for signal: {signal}")
-                        with self.stats_lock:
-                            self.stats["failed_trades"] += 1
+                orders = []
+                staged = [Signal(signal) for signal in candidates]
+                # Buffer views are only valid until the next batch reloads them; consumed before any await
+                entry, sl, tp, is_buy = signal_buffer.load(staged)
+                mask, qty = validate_and_size(entry, sl, tp, is_buy, account_balance)
+                for i, signal in enumerate(staged):
+                    if not mask[i]:
+                        logger.error("Signal failed SL/TP validation for %s: %s", symbol, signal.raw)
+                        self._failed += 1
                         continue
+                    if qty[i] <= 0:
+                        logger.error("Invalid position size for signal: %s", signal.raw)
+                        self._failed += 1
+                        continue
+                    orders.append({
+                        "symbol": signal.symbol,
+                        "side": signal.side,
+                        "order_type": "Limit",
+                        "qty": float(qty[i]),
+                        "price": signal.entry,
+                        "stop_loss": signal.sl,
+                        "take_profit": signal.tp,
+                    })
 
-                    qty = self._calculate_position_size(
-                        entry_price=price,
-                        stop_loss=signal["sl"],
-                        account_balance=account_balance
-                    )
+                if orders:
+                    await order_queue.put((symbol, orders))
+            except Exception as e:
+                logger.error("Error filtering signals for %s: %s", symbol, e)
+                self._failed += 1
 
-                    if qty <= 0:
-                        logger.error(f"Invalid position size for signal: {signal}")
-                        with self.stats_lock:
-                            self.stats["failed_trades"] += 1
-                        continue
+    async def _execute_orders(self, order_queue: asyncio.Queue):
+        balance_cache = self._balance_cache
+        use_http_batch_api = self.use_http_batch_api
+        place_order = self.client.place_order
+        place_order_batch = self.client.place_order_batch
 
-                    trade = self.client.place_order(
-                        symbol=signal["symbol"],
-                        side=signal["side"],
-                        order_type="Limit" if price else "Market",
-                        qty=qty,
-                        price=price,
-                        stop_loss=signal.get("sl"),
-                        take_profit=signal.get("tp"),
+        while self.is_running:
+            item = await self._next_item(order_queue)
+            if item is None:
+                return
+            symbol, orders = item
+            try:
+                if use_http_batch_api:
+                    trades = await asyncio.to_thread(place_order_batch, orders)
+                else:
+                    trades = await asyncio.gather(
+                        *(asyncio.to_thread(place_order, **order) for order in orders)
                     )
 
-                    with self.stats_lock:
-                        if trade:
-                            self.stats["trades_executed"] += 1
-                            self.stats["successful_trades"] += 1
-                            try:
-                                self.engine.db.add_trade(trade)
-                            except Exception as e:
-                                logger.error(f"Error saving trade for {symbol}: {e}")
-                        else:
-                            self.stats["failed_trades"] += 1
-
-                        total_trades = self.stats["successful_trades"] + self.stats["failed_trades"]
-                        self.stats["success_rate"] = (
-                            (self.stats["successful_trades"] / total_trades) * 100
-                            if total_trades > 0 else 0.0
-                        )
-
-                self._update_uptime()
-                time.sleep(1)
+                if any(trades):
+                    # Margin was just committed; make the next pass see the new available balance
+                    balance_cache.invalidate("balance")
 
+                for trade in trades:
+                    if trade:
+                        try:
+                            await asyncio.to_thread(self.engine.db.add_trade, trade)
+                        except Exception as e:
+                            logger.error("Error saving trade for %s: %s", symbol, e)
+                        self.update_count += 1
+                        self._executed += 1
+                        self._successful += 1
+                    else:
+                        self._failed += 1
             except Exception as e:
-                logger.error(f"Error in trading loop for {symbol}: {e}")
-                with self.stats_lock:
-                    self.stats["failed_trades"] += 1
-                time.sleep(5)
+                logger.error("Error placing orders for %s: %s", symbol, e)
+                self._failed += len(orders)
 
-    def _update_uptime(self):
-        if self.start_time:
-            uptime = datetime.now(timezone.utc) - self.start_time
-            with self.stats_lock:
-                self.stats["uptime"] = str(uptime).split(".")[0]
+    def _uptime(self) -> str:
+        # Monotonic so wall-clock adjustments can't skew it; formatted only when status is read
+        if self._start_ns is None:
+            return "0:00:00"
+        elapsed = ((self._stop_ns or time.monotonic_ns()) - self._start_ns) // 1_000_000_000
+        hours, rem = divmod(elapsed, 3600)
+        minutes, seconds = divmod(rem, 60)
+        return f"{hours}:{minutes:02d}:{seconds:02d}"
 
     def get_status(self) -> Dict:
-        with self.stats_lock:
-            return {
-                "is_running": self.is_running,
-                "start_time": self.start_time.isoformat() if self.start_time else None,
-                "stats": self.stats.copy()
+        successful = self._successful
+        failed = self._failed
+        total_trades = successful + failed
+        return {
+            "is_running": self.is_running,
+            "start_time": self.start_time.isoformat() if self.start_time else None,
+            "stats": {
+                "signals_generated": self._signals_generated,
+                "trades_executed": self._executed,
+                "successful_trades": successful,
+                "failed_trades": failed,
+                "success_rate": (successful / total_trades) * 100 if total_trades > 0 else 0.0,
+                "uptime": self._uptime()
             }
+        }
+
+    def _reset_counters(self):
+        # Plain ints: only the event-loop thread increments them, status readers just load them
+        self._signals_generated = 0
+        self._executed = 0
+        self._successful = 0
+        self._failed = 0
 
     def reset_stats(self):
-        with self.stats_lock:
-            self.stats = {
-                "signals_generated": 0,
-                "trades_executed": 0,
-                "successful_trades": 0,
-                "failed_trades": 0,
-                "success_rate": 0.0,
-                "uptime": "0:00:00"
-            }
-        logger.info("Statistics reset")
\ No newline at end of file
+        self._reset_counters()
+        logger.info("Statistics reset")
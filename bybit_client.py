@@ -1,51 +1,170 @@
 import os
-import json
+import sys
 import logging
-import requests
+import threading
+import orjson
 import hmac
 import hashlib
 import time
 import uuid
-from typing import Dict, Optional, List
+import numpy as np
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import DefaultDict, Dict, Optional, List, Tuple, TypedDict
 from dotenv import load_dotenv
-import portalocker
-from utils import LEVERAGE
+
+# Queue-backed logging before utils runs its basicConfig, so order and price paths
+# only enqueue records and a listener thread does the app.log writes
+from logging_config import configure_logging
+configure_logging()
+
+from utils import LEVERAGE, HTTP_SESSION, REQUEST_TIMEOUT, TTLCache, get_json, get_json_store, get_jsonl_log
 
 load_dotenv()
 logger = logging.getLogger(__name__)
-logging.basicConfig(
-    level=logging.INFO,
-    filename="app.log",
-    filemode="a",
-    format="%(asctime)s - %(levelname)s - %(message)s",
-    encoding="utf-8"
-)
+
+BATCH_ORDER_LIMIT = 20  # Bybit caps linear create-batch requests at 20 legs
+MARKET_DATA_WORKERS = 16  # concurrent public GETs per batch; stays under the shared pool's maxsize
+DEFAULT_CAPITAL = {
+    "real": {"capital": 0.0, "available": 0.0, "used": 0.0, "start_balance": 0.0, "currency": "USDT"},
+    "virtual": {"capital": 100.0, "available": 100.0, "used": 0.0, "start_balance": 100.0, "currency": "USDT"}
+}
+_LONG_SIDES = frozenset(("Buy", "LONG"))
+# Direction as a multiplier so P&L and TP/SL tests are arithmetic; unknown sides map to 0
+_SIDE_SIGN = {"Buy": 1, "LONG": 1, "Sell": -1, "SHORT": -1}
+PRICE_TTL = float(os.getenv("PRICE_TTL", "0.25"))  # seconds a last price is reused across callers
+MONITOR_INTERVAL = float(os.getenv("MONITOR_INTERVAL", "1"))  # seconds between virtual SL/TP sweeps
+# (symbol, side) -> positions of open trades in each virtual trades list, keyed by file path
+_open_trade_indexes: Dict[str, DefaultDict[Tuple[str, str], List[int]]] = {}
+EXIT_REASONS = ("manual", "stop_loss", "take_profit")  # codes returned by simulate_closes
+
+class VirtualTrade(TypedDict, total=False):
+    """Fixed schema of a virtual trade record; the close fields are set when it is closed."""
+    order_id: str
+    symbol: str
+    side: str
+    qty: float
+    price: float
+    stopLoss: Optional[float]
+    takeProfit: Optional[float]
+    status: str
+    timestamp: float
+    exit_price: float
+    pnl: float
+    close_timestamp: float
+    exit_reason: str
+
+def simulate_closes(entry: np.ndarray, exit_price: np.ndarray, qty: np.ndarray, sign: np.ndarray,
+                    stop_loss: np.ndarray, take_profit: np.ndarray, inv_leverage: float):
+    """
+    Vectorized virtual close for many trades at once, same rules as close_position:
+    returns (pnl, released margin, index into EXIT_REASONS) per trade. A stop loss or
+    take profit of 0 means none was set.
+    """
+    pnl = sign * (exit_price - entry) * qty
+    margin = qty * exit_price * inv_leverage
+    hit_sl = (stop_loss > 0) & (sign * (exit_price - stop_loss) <= 0)
+    hit_tp = (take_profit > 0) & (sign * (take_profit - exit_price) <= 0)
+    reason = np.where(hit_sl, 1, np.where(hit_tp, 2, 0)).astype(np.int8)
+    return pnl, margin, reason
 
 class BybitClient:
+    BASE_URL = "https://api.bybit.com"  # Always use mainnet for live market data
+    _TIME_URL = BASE_URL + "/v5/market/time"
+    _TICKERS_URL = BASE_URL + "/v5/market/tickers"
+    _INSTRUMENTS_URL = BASE_URL + "/v5/market/instruments-info"
+    _KLINE_URL = BASE_URL + "/v5/market/kline"
+    _WALLET_URL = BASE_URL + "/v5/account/wallet-balance"
+    _ORDER_URL = BASE_URL + "/v5/order/create"
+    _BATCH_ORDER_URL = BASE_URL + "/v5/order/create-batch"
+
     def __init__(self):
         self.api_key = os.getenv("BYBIT_API_KEY", "F7aQeUkd3obyUSDeNJ")
         self.api_secret = os.getenv("BYBIT_API_SECRET", "A8WNJSiQodExiy2U2GsKTp2Na5ytSwBlK7iD")
         self.account_type = os.getenv("BYBIT_ACCOUNT_TYPE", "UNIFIED")
+        self._wallet_params = {"accountType": self.account_type}  # read-only; sent and signed as-is
         self.real_mode = os.getenv("REAL", "false").lower() == "true"
         self.virtual_mode = os.getenv("VIRTUAL", "true").lower() == "true"
-        self.base_url = "https://api.bybit.com"  # Always use mainnet for live market data
+        self.base_url = self.BASE_URL
         self.is_connected_flag = self.real_mode and not self.virtual_mode and bool(self.api_key and self.api_secret)
         self.capital_file = "capital.json"
-        self.virtual_trades_file = "virtual_trades.json"
+        self.virtual_trades_file = "virtual_trades.jsonl"
+        # Shared in-memory copies; the hot paths never touch disk, a background flusher does
+        self._capital = get_json_store(self.capital_file, DEFAULT_CAPITAL)
+        # Append-only: each order or close writes one line instead of the whole history
+        self._virtual_trades = get_jsonl_log(self.virtual_trades_file, legacy_path="virtual_trades.json")
+        self.session = HTTP_SESSION
+        self._signing_prefix = (self.api_key + "5000").encode("utf-8")
+        # Per-request auth headers only add the signature and timestamp to these
+        self._static_auth_headers = {"X-BAPI-API-KEY": self.api_key, "X-BAPI-RECV-WINDOW": "5000"}
+        # Keyed on the first signed request; virtual mode never signs, so it never pays for it
+        self._hmac_prototype = None
+        self._price_cache = TTLCache(ttl=PRICE_TTL)
+        self._inv_leverage = 1.0 / LEVERAGE  # margin = notional * _inv_leverage
+        self._monitor_stop: Optional[threading.Event] = None
 
     def is_connected(self) -> bool:
         return self.is_connected_flag
 
+    def _open_trades_index(self, virtual_trades: List[Dict]) -> DefaultDict[Tuple[str, str], List[int]]:
+        """Open-trade index for the shared trade list; call with the store's edit lock held."""
+        index = _open_trade_indexes.get(self.virtual_trades_file)
+        if index is None:
+            index = defaultdict(list)
+            for i, trade in enumerate(virtual_trades):
+                if trade.get("status") == "open":
+                    trade["symbol"], trade["side"] = sys.intern(trade["symbol"]), sys.intern(trade["side"])
+                    index[trade["symbol"], trade["side"]].append(i)
+            _open_trade_indexes[self.virtual_trades_file] = index
+        return index
+
+    def _request(self, url: str, params: Optional[Dict] = None, headers: Optional[Dict] = None) -> Dict:
+        """Decoded GET on this client's session; idempotent, so retried with a short backoff."""
+        return get_json(url, params=params, headers=headers, session=self.session)
+
+    def ping(self) -> bool:
+        """Cheap unauthenticated round-trip that keeps the pooled keep-alive connection open."""
+        try:
+            response = self._request(self._TIME_URL)
+            return response.get("retCode") == 0
+        except Exception as e:
+            logger.debug(f"Keep-alive ping failed: {e}")
+            return False
+
+    def _sign(self, timestamp: str, payload: bytes) -> str:
+        prototype = self._hmac_prototype
+        if prototype is None:
+            # Key schedule done once; each signature copies the keyed state instead of re-deriving it
+            prototype = self._hmac_prototype = hmac.new(self.api_secret.encode("utf-8"), None, hashlib.sha256)
+        mac = prototype.copy()
+        mac.update(timestamp.encode("utf-8") + self._signing_prefix + payload)
+        return mac.hexdigest()
+
     def _generate_signature(self, params: Dict, timestamp: str) -> str:
-        param_str = timestamp + self.api_key + "5000" + "&".join(f"{k}={v}" for k, v in sorted(params.items()))
-        return hmac.new(self.api_secret.encode('utf-8'), param_str.encode('utf-8'), hashlib.sha256).hexdigest()
+        return self._sign(timestamp, "&".join(f"{k}={v}" for k, v in sorted(params.items())).encode("utf-8"))
+
+    def _generate_body_signature(self, payload: str, timestamp: str) -> str:
+        return self._sign(timestamp, payload.encode("utf-8"))
 
-    from tenacity import retry, stop_after_attempt, wait_fixed
-    @retry(stop=stop_after_attempt(3), wait=wait_fixed(2))
     def get_current_price(self, symbol: str) -> float:
+        # TP/SL checks, PnL and closes all ask for the same symbols back-to-back; share one fetch per window
+        return self._price_cache.get_or(symbol, lambda: self._fetch_current_price(symbol))
+
+    def get_current_prices_batch(self, symbols: List[str]) -> Dict[str, float]:
+        """Price many symbols with one tickers round-trip, warming the per-symbol cache for later calls."""
+        # Repeat callers inside the price window (page reruns, the SL/TP sweep) skip the request entirely
+        cached = {symbol: self._price_cache.get(symbol) for symbol in symbols}
+        if None not in cached.values():
+            return cached
+        prices = {ticker["symbol"]: ticker["lastPrice"] for ticker in self.get_tickers()}
+        for symbol, price in prices.items():
+            self._price_cache.put(symbol, price)
+        return {symbol: prices[symbol] if symbol in prices else self.get_current_price(symbol) for symbol in symbols}
+
+    def _fetch_current_price(self, symbol: str) -> float:
         try:
-            url = f"{self.base_url}/v5/market/tickers?category=linear&symbol={symbol}"
-            response = requests.get(url).json()
+            params = {"category": "linear", "symbol": symbol}
+            response = self._request(self._TICKERS_URL, params=params)
             if response.get("retCode") == 0:
                 return float(response["result"]["list"][0]["lastPrice"])
             logger.error(f"Error getting price for {symbol}: {response.get('retMsg')}")
@@ -59,16 +178,14 @@ class BybitClient:
             logger.info("Using virtual wallet balance from capital.json")
             return self.load_capital("virtual")
         try:
-            timestamp = str(int(time.time() * 1000))
-            params = {"accountType": self.account_type}
+            timestamp = str(time.time_ns() // 1_000_000)
+            params = self._wallet_params
             headers = {
-                "X-BAPI-API-KEY": self.api_key,
+                **self._static_auth_headers,
                 "X-BAPI-SIGN": self._generate_signature(params, timestamp),
-                "X-BAPI-TIMESTAMP": timestamp,
-                "X-BAPI-RECV-WINDOW": "5000"
+                "X-BAPI-TIMESTAMP": timestamp
             }
-            url = f"{self.base_url}/v5/account/wallet-balance"
-            response = requests.get(url, headers=headers, params=params).json()
+            response = self._request(self._WALLET_URL, headers=headers, params=params)
             if response.get("retCode") == 0:
                 balance = response["result"]["list"][0]
                 return {
@@ -86,8 +203,7 @@ class BybitClient:
 
     def get_tickers(self, category: str = "linear") -> List[Dict]:
         try:
-            url = f"{self.base_url}/v5/market/tickers?category={category}"
-            response = requests.get(url).json()
+            response = self._request(self._TICKERS_URL, params={"category": category})
             if response.get("retCode") == 0:
                 return [
                     {
@@ -96,7 +212,7 @@ class BybitClient:
                         "price24hPcnt": float(ticker["price24hPcnt"])
                     }
                     for ticker in response["result"]["list"]
-                    if ticker["symbol"].endswith("USDT")
+                    if ticker["symbol"][-4:] == "USDT"
                 ]
             logger.error(f"Error getting tickers: {response.get('retMsg')}")
             return []
@@ -106,13 +222,12 @@ class BybitClient:
 
     def get_symbols(self) -> List[Dict]:
         try:
-            url = f"{self.base_url}/v5/market/instruments-info?category=linear"
-            response = requests.get(url).json()
+            response = self._request(self._INSTRUMENTS_URL, params={"category": "linear"})
             if response.get("retCode") == 0:
                 return [
                     {"symbol": instrument["symbol"]}
                     for instrument in response["result"]["list"]
-                    if instrument["symbol"].endswith("USDT")
+                    if instrument["symbol"][-4:] == "USDT"
                 ]
             logger.error(f"Error getting symbols: {response.get('retMsg')}")
             return []
@@ -120,105 +235,156 @@ class BybitClient:
             logger.error(f"Error getting symbols: {e}")
             return []
 
-    @retry(stop=stop_after_attempt(3), wait=wait_fixed(2))
     def get_kline(
         self,
         symbol: str,
         interval: str = "60",
         limit: int = 200,
         category: str = "linear"
-    ) -> List[Dict]:
-        
+    ) -> Dict[str, np.ndarray]:
+        """
+        Candles as columns ("timestamp", "open", "high", "low", "close", "volume"),
+        oldest first. Returns an empty dict on failure.
+        """
         try:
-            url = f"{self.base_url}/v5/market/kline"
             params = {
                 "category": category,
                 "symbol": symbol,
                 "interval": interval,
                 "limit": str(limit)
             }
-            response = requests.get(url, params=params).json()
+            response = self._request(self._KLINE_URL, params=params)
             if response.get("retCode") == 0:
-                candles = [
-                    {
-                        "timestamp": int(c[0]),
-                        "open": float(c[1]),
-                        "high": float(c[2]),
-                        "low": float(c[3]),
-                        "close": float(c[4]),
-                        "volume": float(c[5])
-                    }
-                    for c in response["result"]["list"]
-                ]
-                # Ensure chronological order (Bybit often returns newest first)
-                return sorted(candles, key=lambda x: x["timestamp"])
+                rows = [c[:6] for c in response["result"]["list"]]
+                arr = np.asarray(rows, dtype=np.float64).reshape(-1, 6)
+                # Bybit returns newest first; flip with a view instead of sorting
+                if len(arr) > 1 and arr[0, 0] > arr[-1, 0]:
+                    arr = arr[::-1]
+                return {
+                    "timestamp": arr[:, 0].astype(np.int64),
+                    "open": arr[:, 1],
+                    "high": arr[:, 2],
+                    "low": arr[:, 3],
+                    "close": arr[:, 4],
+                    "volume": arr[:, 5]
+                }
             logger.error(f"Error fetching kline for {symbol}: {response.get('retMsg')}")
-            return []
+            return {}
         except Exception as e:
             logger.error(f"Exception fetching kline for {symbol}: {e}")
+            return {}
+
+    def get_kline_records(
+        self,
+        symbol: str,
+        interval: str = "60",
+        limit: int = 200,
+        category: str = "linear"
+    ) -> List[Dict]:
+        """Deprecated: one dict per candle, as get_kline used to return. Prefer the columns from get_kline."""
+        columns = self.get_kline(symbol, interval, limit, category)
+        if not columns:
             return []
+        return [
+            {
+                "timestamp": int(ts),
+                "open": float(o),
+                "high": float(h),
+                "low": float(l),
+                "close": float(c),
+                "volume": float(v)
+            }
+            for ts, o, h, l, c, v in zip(*(columns[key] for key in ("timestamp", "open", "high", "low", "close", "volume")))
+        ]
+
+    def get_klines_batch(
+        self,
+        symbols: List[str],
+        interval: str = "60",
+        limit: int = 200,
+        category: str = "linear"
+    ) -> Dict[str, Dict[str, np.ndarray]]:
+        """Fetch klines for many symbols concurrently over the shared pool: ~1 RTT instead of N."""
+        if not symbols:
+            return {}
+        with ThreadPoolExecutor(max_workers=min(MARKET_DATA_WORKERS, len(symbols))) as pool:
+            candles = pool.map(lambda symbol: self.get_kline(symbol, interval, limit, category), symbols)
+            return dict(zip(symbols, candles))
+
+    def _validate_order(self, symbol: str, side: str, order_type: str, qty: float, price: float = 0.0, stop_loss: Optional[float] = None, take_profit: Optional[float] = None) -> bool:
+        if qty <= 0:
+            logger.error(f"Invalid quantity: {qty}")
+            return False
+        if price < 0 or (order_type == "Limit" and price <= 0):
+            logger.error(f"Invalid price for {order_type} order: {price}")
+            return False
+        sign = _SIDE_SIGN.get(side, 0)
+        if stop_loss is not None and (stop_loss <= 0 or (sign and sign * (stop_loss - price) >= 0)):
+            logger.error(f"Invalid stop loss: {stop_loss} for side {side} and price {price}")
+            return False
+        if take_profit is not None and (take_profit <= 0 or (sign and sign * (price - take_profit) >= 0)):
+            logger.error(f"Invalid take profit: {take_profit} for side {side} and price {price}")
+            return False
+        return True
+
+    def _order_params(self, symbol: str, side: str, order_type: str, qty: float, price: float = 0.0, stop_loss: Optional[float] = None, take_profit: Optional[float] = None, category: Optional[str] = None) -> Dict:
+        # Built up field by field so absent values never need a stripping pass
+        params = {"category": category} if category else {}
+        params["symbol"] = symbol
+        params["side"] = side
+        params["orderType"] = order_type
+        params["qty"] = str(qty)
+        if order_type == "Limit":
+            params["price"] = str(price)
+        if stop_loss is not None:
+            params["stopLoss"] = str(stop_loss)
+        if take_profit is not None:
+            params["takeProfit"] = str(take_profit)
+        return params
 
     def place_order(self, symbol: str, side: str, order_type: str, qty: float, price: float = 0.0, stop_loss: Optional[float] = None, take_profit: Optional[float] = None) -> Optional[Dict]:
         try:
             # Validate inputs
-            if qty <= 0:
-                logger.error(f"Invalid quantity: {qty}")
-                return None
-            if price < 0 or (order_type == "Limit" and price <= 0):
-                logger.error(f"Invalid price for {order_type} order: {price}")
-                return None
-            if stop_loss is not None and (stop_loss <= 0 or (side in ["Buy", "LONG"] and stop_loss >= price) or (side in ["Sell", "SHORT"] and stop_loss <= price)):
-                logger.error(f"Invalid stop loss: {stop_loss} for side {side} and price {price}")
-                return None
-            if take_profit is not None and (take_profit <= 0 or (side in ["Buy", "LONG"] and take_profit <= price) or (side in ["Sell", "SHORT"] and take_profit >= price)):
-                logger.error(f"Invalid take profit: {take_profit} for side {side} and price {price}")
+            if not self._validate_order(symbol, side, order_type, qty, price, stop_loss, take_profit):
                 return None
 
             if self.virtual_mode or not self.is_connected():
                 logger.info(f"Simulating order in virtual mode: {symbol}, {side}, {qty}, price={price}, sl={stop_loss}, tp={take_profit}")
-                capital_data = self.load_capital("virtual")
-                margin_usdt = qty * price / LEVERAGE if price > 0 else 0.0
-                if margin_usdt > capital_data.get("available", 0.0):
-                    logger.error(f"Insufficient virtual funds: {margin_usdt} > {capital_data.get('available', 0.0)}")
-                    return None
-                capital_data["available"] -= margin_usdt
-                capital_data["used"] = capital_data.get("used", 0.0) + margin_usdt
-                self.save_capital("virtual", capital_data)
-                trade_data = {
+                # Interned so the open-trade index and price lookups compare by identity
+                symbol, side = sys.intern(symbol), sys.intern(side)
+                margin_usdt = qty * max(price, 0.0) * self._inv_leverage
+                # Check and reserve margin in place under the store lock: no copy, no lost update
+                with self._capital.edit() as all_capital:
+                    capital_data = self._virtual_capital(all_capital)
+                    if margin_usdt > capital_data.get("available", 0.0):
+                        logger.error(f"Insufficient virtual funds: {margin_usdt} > {capital_data.get('available', 0.0)}")
+                        return None
+                    capital_data["available"] -= margin_usdt
+                    capital_data["used"] = capital_data.get("used", 0.0) + margin_usdt
+                trade_data: VirtualTrade = {
                     "order_id": str(uuid.uuid4()),
                     "symbol": symbol,
                     "side": side,
-                    "qty": qty,
-                    "price": price,
-                    "stopLoss": stop_loss,
-                    "takeProfit": take_profit,
+                    # Numeric fields are coerced once here, so readers of the trade log never re-cast
+                    "qty": float(qty),
+                    "price": float(price),
+                    "stopLoss": float(stop_loss) if stop_loss is not None else None,
+                    "takeProfit": float(take_profit) if take_profit is not None else None,
                     "status": "open",
                     "timestamp": time.time()
                 }
-                virtual_trades = self._load_json_file(self.virtual_trades_file, [])
-                virtual_trades.append(trade_data)
-                self._save_json_file(self.virtual_trades_file, virtual_trades)
+                with self._virtual_trades.locked() as virtual_trades:
+                    self._open_trades_index(virtual_trades)[symbol, side].append(len(virtual_trades))
+                    self._virtual_trades.append(dict(trade_data))
                 return trade_data
-            timestamp = str(int(time.time() * 1000))
-            params = {
-                "category": "linear",
-                "symbol": symbol,
-                "side": side,
-                "orderType": order_type,
-                "qty": str(qty),
-                "price": str(price) if order_type == "Limit" else None,
-                "stopLoss": str(stop_loss) if stop_loss is not None else None,
-                "takeProfit": str(take_profit) if take_profit is not None else None
-            }
-            params = {k: v for k, v in params.items() if v is not None}
+            timestamp = str(time.time_ns() // 1_000_000)
+            params = self._order_params(symbol, side, order_type, qty, price, stop_loss, take_profit, category="linear")
             headers = {
-                "X-BAPI-API-KEY": self.api_key,
+                **self._static_auth_headers,
                 "X-BAPI-SIGN": self._generate_signature(params, timestamp),
-                "X-BAPI-TIMESTAMP": timestamp,
-                "X-BAPI-RECV-WINDOW": "5000"
+                "X-BAPI-TIMESTAMP": timestamp
             }
-            url = f"{self.base_url}/v5/order/create"
-            response = requests.post(url, json=params, headers=headers).json()
+            response = orjson.loads(self.session.post(self._ORDER_URL, json=params, headers=headers, timeout=REQUEST_TIMEOUT).content)
             if response.get("retCode") == 0:
                 return response["result"]
             logger.error(f"Error placing order: {response.get('retMsg')}")
@@ -227,59 +393,71 @@ class BybitClient:
             logger.error(f"Error placing order: {e}")
             return None
 
+    def place_order_batch(self, orders: List[Dict]) -> List[Optional[Dict]]:
+        """
+        Place several orders (place_order keyword dicts) and return one result per
+        order, None for legs that failed. Real orders go through Bybit's
+        create-batch endpoint, BATCH_ORDER_LIMIT legs per request.
+        """
+        if self.virtual_mode or not self.is_connected():
+            return [self.place_order(**order) for order in orders]
+
+        results: List[Optional[Dict]] = [None] * len(orders)
+        legs = [(i, self._order_params(**order)) for i, order in enumerate(orders) if self._validate_order(**order)]
+        for start in range(0, len(legs), BATCH_ORDER_LIMIT):
+            chunk = legs[start:start + BATCH_ORDER_LIMIT]
+            try:
+                payload = orjson.dumps({"category": "linear", "request": [params for _, params in chunk]}).decode()
+                timestamp = str(time.time_ns() // 1_000_000)
+                headers = {
+                    **self._static_auth_headers,
+                    "X-BAPI-SIGN": self._generate_body_signature(payload, timestamp),
+                    "X-BAPI-TIMESTAMP": timestamp,
+                    "Content-Type": "application/json"
+                }
+                response = orjson.loads(self.session.post(self._BATCH_ORDER_URL, data=payload, headers=headers, timeout=REQUEST_TIMEOUT).content)
+                if response.get("retCode") != 0:
+                    logger.error(f"Error placing batch orders: {response.get('retMsg')}")
+                    continue
+                created = response["result"].get("list", [])
+                statuses = response.get("retExtInfo", {}).get("list", [])
+                for (i, params), leg, status in zip(chunk, created, statuses):
+                    if status.get("code") == 0:
+                        results[i] = leg
+                    else:
+                        logger.error(f"Error placing batch order for {params['symbol']}: {status.get('msg')}")
+            except Exception as e:
+                logger.error(f"Error placing batch orders: {e}")
+        return results
+
     def close_position(self, symbol: str, side: str, qty: float) -> bool:
         try:
             if self.virtual_mode or not self.is_connected():
                 logger.info(f"Simulating close in virtual mode: {symbol}, {side}, {qty}")
-                capital_data = self.load_capital("virtual")
                 current_price = self.get_current_price(symbol)
-                margin_usdt = qty * current_price / LEVERAGE
-                capital_data["available"] += margin_usdt
-                capital_data["used"] = max(0.0, capital_data.get("used", 0.0) - margin_usdt)
-                virtual_trades = self._load_json_file(self.virtual_trades_file, [])
-                for trade in virtual_trades:
-                    if trade["symbol"] == symbol and trade["side"] == side and trade["status"] == "open" and abs(trade["qty"] - qty) < 1e-6:
-                        trade["status"] = "closed"
-                        trade["exit_price"] = current_price
-                        trade["pnl"] = (current_price - trade["price"]) * qty if side in ["Buy", "LONG"] else (trade["price"] - current_price) * qty
-                        trade["close_timestamp"] = time.time()
-                        # Check if TP or SL was triggered
-                        if trade.get("stopLoss") and (
-                            (side in ["Buy", "LONG"] and current_price <= trade["stopLoss"]) or
-                            (side in ["Sell", "SHORT"] and current_price >= trade["stopLoss"])
-                        ):
-                            trade["exit_reason"] = "stop_loss"
-                        elif trade.get("takeProfit") and (
-                            (side in ["Buy", "LONG"] and current_price >= trade["takeProfit"]) or
-                            (side in ["Sell", "SHORT"] and current_price <= trade["takeProfit"])
-                        ):
-                            trade["exit_reason"] = "take_profit"
-                        else:
-                            trade["exit_reason"] = "manual"
-                        capital_data["capital"] += trade["pnl"]
-                        self.save_capital("virtual", capital_data)
-                        break
-                else:
-                    logger.error(f"No matching open virtual trade found for {symbol}, {side}, {qty}")
-                    return False
-                self._save_json_file(self.virtual_trades_file, virtual_trades)
+                with self._virtual_trades.locked() as virtual_trades:
+                    for i in self._open_trades_index(virtual_trades).get((symbol, side), []):
+                        if abs(virtual_trades[i]["qty"] - qty) < 1e-6:
+                            self._close_virtual_trade(virtual_trades, i, current_price)
+                            break
+                    else:
+                        logger.error(f"No matching open virtual trade found for {symbol}, {side}, {qty}")
+                        return False
                 return True
-            timestamp = str(int(time.time() * 1000))
+            timestamp = str(time.time_ns() // 1_000_000)
             params = {
                 "category": "linear",
                 "symbol": symbol,
-                "side": "Sell" if side in ["Buy", "LONG"] else "Buy",
+                "side": "Sell" if side in _LONG_SIDES else "Buy",
                 "orderType": "Market",
                 "qty": str(qty)
             }
             headers = {
-                "X-BAPI-API-KEY": self.api_key,
+                **self._static_auth_headers,
                 "X-BAPI-SIGN": self._generate_signature(params, timestamp),
-                "X-BAPI-TIMESTAMP": timestamp,
-                "X-BAPI-RECV-WINDOW": "5000"
+                "X-BAPI-TIMESTAMP": timestamp
             }
-            url = f"{self.base_url}/v5/order/create"
-            response = requests.post(url, json=params, headers=headers).json()
+            response = orjson.loads(self.session.post(self._ORDER_URL, json=params, headers=headers, timeout=REQUEST_TIMEOUT).content)
             if response.get("retCode") == 0:
                 return True
             logger.error(f"Error closing position: {response.get('retMsg')}")
@@ -288,6 +466,40 @@ class BybitClient:
             logger.error(f"Error closing position: {e}")
             return False
 
+    def _close_virtual_trade(self, virtual_trades: List[Dict], i: int, exit_price: float, exit_reason: Optional[str] = None) -> None:
+        """
+        Close the open virtual trade at log position i and settle its margin and P&L.
+        Without an exit_reason the stop loss and take profit are tested at exit_price.
+        Call with the trade log lock held.
+        """
+        trade = virtual_trades[i]
+        symbol, side, qty = trade["symbol"], trade["side"], trade["qty"]
+        self._open_trades_index(virtual_trades)[symbol, side].remove(i)
+        sign = _SIDE_SIGN.get(side, -1)
+        changes = {
+            "status": "closed",
+            "exit_price": exit_price,
+            "pnl": sign * (exit_price - trade["price"]) * qty,
+            "close_timestamp": time.time()
+        }
+        if exit_reason is None:
+            # Unknown sides count as short for P&L but never match a stop or target
+            direction = _SIDE_SIGN.get(side, 0)
+            if direction and trade.get("stopLoss") and direction * (exit_price - trade["stopLoss"]) <= 0:
+                exit_reason = "stop_loss"
+            elif direction and trade.get("takeProfit") and direction * (trade["takeProfit"] - exit_price) <= 0:
+                exit_reason = "take_profit"
+            else:
+                exit_reason = "manual"
+        changes["exit_reason"] = exit_reason
+        self._virtual_trades.update(i, changes)
+        margin_usdt = qty * exit_price * self._inv_leverage
+        with self._capital.edit() as all_capital:
+            capital_data = self._virtual_capital(all_capital)
+            capital_data["available"] += margin_usdt
+            capital_data["used"] = max(0.0, capital_data.get("used", 0.0) - margin_usdt)
+            capital_data["capital"] += changes["pnl"]
+
     def check_tp_sl(self, symbol: str, side: str, entry_price: float, qty: float, stop_loss: Optional[float], take_profit: Optional[float]) -> Optional[str]:
         try:
             if not stop_loss and not take_profit:
@@ -296,90 +508,153 @@ class BybitClient:
             if current_price == 0.0:
                 logger.error(f"Cannot check TP/SL for {symbol}: Invalid current price")
                 return None
-            if stop_loss and (
-                (side in ["Buy", "LONG"] and current_price <= stop_loss) or
-                (side in ["Sell", "SHORT"] and current_price >= stop_loss)
-            ):
+            sign = _SIDE_SIGN.get(side, 0)
+            if not sign:
+                return None
+            if stop_loss and sign * (current_price - stop_loss) <= 0:
                 return "stop_loss"
-            if take_profit and (
-                (side in ["Buy", "LONG"] and current_price >= take_profit) or
-                (side in ["Sell", "SHORT"] and current_price <= take_profit)
-            ):
+            if take_profit and sign * (take_profit - current_price) <= 0:
                 return "take_profit"
             return None
         except Exception as e:
             logger.error(f"Error checking TP/SL for {symbol}: {e}")
             return None
 
+    def tick_virtual_positions(self) -> List[Dict]:
+        """
+        Single pass over the open virtual trades: price every symbol with one tickers
+        request, close the trades whose stop loss or take profit was hit, and return
+        the rest with current_price and unrealized_pnl filled in.
+        """
+        with self._virtual_trades.locked() as virtual_trades:
+            # Tuples and counts are taken under the lock, so an order or close racing the sweep
+            # cannot shift the live index lists out from under the row columns built below
+            groups = [(key, tuple(positions)) for key, positions in self._open_trades_index(virtual_trades).items() if positions]
+            counts = [len(positions) for _, positions in groups]
+            rows = [i for _, positions in groups for i in positions]
+            open_trades = [dict(virtual_trades[i]) for i in rows]
+        if not open_trades:
+            return []
+        # The index already groups trades by (symbol, side): resolve the symbol slot and side
+        # sign once per group and repeat them down the rows instead of looking them up per trade
+        symbol_idx: Dict[str, int] = {}
+        n = len(open_trades)
+        slots = np.repeat(np.fromiter((symbol_idx.setdefault(symbol, len(symbol_idx)) for (symbol, _), _ in groups), dtype=np.intp, count=len(groups)), counts)
+        prices = self.get_current_prices_batch(list(symbol_idx))
+        symbol_prices = np.fromiter((prices.get(symbol, 0.0) for symbol in symbol_idx), dtype=np.float64, count=len(symbol_idx))
+        # Columns for the whole open book, so the SL/TP test and P&L are a few array ops
+        current_price = symbol_prices[slots]
+        entry = np.fromiter((t["price"] for t in open_trades), dtype=np.float64, count=n)
+        qty = np.fromiter((t["qty"] for t in open_trades), dtype=np.float64, count=n)
+        group_sign = np.fromiter((_SIDE_SIGN.get(side, 0) for (_, side), _ in groups), dtype=np.int8, count=len(groups))
+        known_side = np.repeat(group_sign != 0, counts)
+        sign = np.repeat(np.where(group_sign != 0, group_sign, -1).astype(np.int8), counts)
+        stop_loss = np.fromiter((t.get("stopLoss") or 0.0 for t in open_trades), dtype=np.float64, count=n)
+        take_profit = np.fromiter((t.get("takeProfit") or 0.0 for t in open_trades), dtype=np.float64, count=n)
+        priced = current_price > 0
+        unrealized_pnl, _, reason = simulate_closes(entry, current_price, qty, sign, stop_loss, take_profit, self._inv_leverage)
+        unrealized_pnl[~priced] = 0.0
+        unrealized_pnl += 0.0  # flat positions report 0.0, not -0.0
+        closed = np.zeros(n, dtype=bool)
+        # Only the few hit rows drop back to Python for the close bookkeeping. Each closes its
+        # own log row at the tested price, unless an order or close got to it first.
+        hit = np.flatnonzero((reason > 0) & priced & known_side)
+        if len(hit):
+            with self._virtual_trades.locked() as virtual_trades:
+                index = self._open_trades_index(virtual_trades)
+                for k in hit:
+                    trade = open_trades[k]
+                    if rows[k] in index.get((trade["symbol"], trade["side"]), ()):
+                        self._close_virtual_trade(virtual_trades, rows[k], float(current_price[k]), EXIT_REASONS[reason[k]])
+                        closed[k] = True
+        return [
+            {**open_trades[i], "current_price": float(current_price[i]), "unrealized_pnl": float(unrealized_pnl[i])}
+            for i in np.flatnonzero(~closed)
+        ]
+
+    def start_monitoring(self, interval: float = MONITOR_INTERVAL) -> None:
+        """
+        Sweep the virtual stop losses and take profits on a background thread every
+        interval seconds, so query and order paths never run the sweep inline.
+        """
+        if self._monitor_stop is not None:
+            return
+        self._monitor_stop = threading.Event()
+        threading.Thread(target=self._monitor_loop, args=(self._monitor_stop, interval), name="sl-tp-monitor", daemon=True).start()
+
+    def stop_monitoring(self) -> None:
+        if self._monitor_stop is not None:
+            self._monitor_stop.set()
+            self._monitor_stop = None
+
+    def _monitor_loop(self, stop: threading.Event, interval: float) -> None:
+        while not stop.wait(interval):
+            # Real mode closes go to the exchange, which enforces its own SL/TP
+            if not (self.virtual_mode or not self.is_connected()):
+                continue
+            try:
+                self.tick_virtual_positions()
+            except Exception as e:
+                logger.error(f"Error sweeping virtual SL/TP: {e}")
+
+    def simulate_virtual_closes(self, trades: List[Dict], exit_prices) -> Dict:
+        """
+        Replay closing `trades` (virtual trade records) at `exit_prices` without touching the
+        trade log or capital: per-trade pnl and exit reasons plus the resulting capital change.
+        """
+        n = len(trades)
+        if not n:
+            return {"pnl": np.zeros(0), "exit_reason": [], "capital_delta": 0.0, "margin_released": 0.0}
+        entry = np.fromiter((t["price"] for t in trades), dtype=np.float64, count=n)
+        qty = np.fromiter((t["qty"] for t in trades), dtype=np.float64, count=n)
+        sign = np.fromiter((_SIDE_SIGN.get(t["side"], -1) for t in trades), dtype=np.float64, count=n)
+        stop_loss = np.fromiter((t.get("stopLoss") or 0.0 for t in trades), dtype=np.float64, count=n)
+        take_profit = np.fromiter((t.get("takeProfit") or 0.0 for t in trades), dtype=np.float64, count=n)
+        exit_price = np.asarray(exit_prices, dtype=np.float64)
+        pnl, margin, reason = simulate_closes(entry, exit_price, qty, sign, stop_loss, take_profit, self._inv_leverage)
+        return {
+            "pnl": pnl,
+            "exit_reason": [EXIT_REASONS[code] for code in reason],
+            "capital_delta": float(pnl.sum()),
+            "margin_released": float(margin.sum())
+        }
+
     def get_open_pnl(self, symbol: str, side: str, qty: float, entry_price: float) -> float:
         try:
             current_price = self.get_current_price(symbol)
             if current_price == 0.0:
                 logger.error(f"Cannot calculate P&L for {symbol}: Invalid current price")
                 return 0.0
-            return (current_price - entry_price) * qty if side in ["Buy", "LONG"] else (entry_price - current_price) * qty
+            return _SIDE_SIGN.get(side, -1) * (current_price - entry_price) * qty
         except Exception as e:
             logger.error(f"Error calculating open P&L for {symbol}: {e}")
             return 0.0
 
+    @staticmethod
+    def _virtual_capital(all_capital: Dict) -> Dict:
+        """The live virtual section of the capital store; call inside its edit()."""
+        return all_capital.setdefault("virtual", dict(DEFAULT_CAPITAL["virtual"]))
+
     def load_capital(self, mode: str) -> Dict:
         try:
-            with open(self.capital_file, "r") as f:
-                portalocker.lock(f, portalocker.LOCK_SH)
-                capital_data = json.load(f)
-                portalocker.unlock(f)
-                return capital_data.get(mode, {"capital": 100.0, "available": 100.0, "used": 0.0, "start_balance": 100.0, "currency": "USDT"})
-        except FileNotFoundError:
-            default_capital = {
-                "real": {"capital": 0.0, "available": 0.0, "used": 0.0, "start_balance": 0.0, "currency": "USDT"},
-                "virtual": {"capital": 100.0, "available": 100.0, "used": 0.0, "start_balance": 100.0, "currency": "USDT"}
-            }
-            self.save_capital("all", default_capital)
-            return default_capital[mode]
+            capital_data = self._capital.snapshot()
+            return capital_data.get(mode, {"capital": 100.0, "available": 100.0, "used": 0.0, "start_balance": 100.0, "currency": "USDT"})
         except Exception as e:
             logger.error(f"Error loading capital: {e}")
             return {"capital": 100.0, "available": 100.0, "used": 0.0, "start_balance": 100.0, "currency": "USDT"}
 
     def save_capital(self, mode: str, capital_data: Dict):
         try:
-            all_capital = self.load_capital("all") if mode != "all" else {}
-            if mode != "all":
-                all_capital[mode] = capital_data
-            else:
-                all_capital = capital_data
-            with open(self.capital_file, "w") as f:
-                portalocker.lock(f, portalocker.LOCK_EX)
-                json.dump(all_capital, f, indent=4)
-                portalocker.unlock(f)
+            # Merge into the stored dict in place; no separate read of the other modes
+            with self._capital.edit() as all_capital:
+                if mode == "all":
+                    all_capital.clear()
+                    all_capital.update(capital_data)
+                else:
+                    all_capital[mode] = capital_data
         except Exception as e:
             logger.error(f"Error saving capital: {e}")
 
-    def _load_json_file(self, path: str, default):
-        try:
-            with open(path, "r") as f:
-                portalocker.lock(f, portalocker.LOCK_SH)
-                data = json.load(f)
-                portalocker.unlock(f)
-                return data
-        except (FileNotFoundError, PermissionError, json.JSONDecodeError) as e:
-            logger.warning(f"Could not read {path}: {e}")
-            return default
-        except Exception as e:
-            logger.error(f"Unexpected error reading {path}: {e}")
-            return default
-
-    def _save_json_file(self, path: str, data):
-        try:
-            with open(path, "w") as f:
-                portalocker.lock(f, portalocker.LOCK_EX)
-                json.dump(data, f, indent=4)
-                f.flush()
-                portalocker.unlock(f)
-        except (PermissionError, OSError) as e:
-            logger.error(f"Could not write {path}: {e}")
-        except Exception as e:
-            logger.error(f"Unexpected error writing {path}: {e}")
-
     def safe_float(self, value, default=0.0):
         try:
             if value is None or (isinstance(value, str) and value.strip() == ""):
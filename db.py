@@ -1,5 +1,6 @@
 import os
 import json
+import time
 from datetime import datetime, date, timezone
 from typing import List, Optional, Dict, Union, Any
 from dotenv import load_dotenv
@@ -20,6 +21,8 @@ logger = logging.getLogger(__name__)
 
 load_dotenv()
 
+DAILY_PNL_TTL = float(os.getenv("DAILY_PNL_TTL", "5"))  # seconds a daily P&L sum is reused
+
 Base = declarative_base()
 
 class Signal(Base):
@@ -147,6 +150,8 @@ class DatabaseManager:
     def __init__(self, database_url: str):
         self.engine = create_engine(database_url, echo=False)
         self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+        self._day_start = (-1, datetime.min)  # (UTC day number, that day's midnight)
+        self._daily_pnl: Optional[tuple] = None  # (day start, monotonic fetch time, value)
         self.init_db()
 
     def init_db(self):
@@ -176,6 +181,7 @@ class DatabaseManager:
             trade = Trade(**trade_data)
             session.add(trade)
             session.commit()
+            self._daily_pnl = None
             logger.info("Trade added to DB")
 
     def get_trades(self, symbol: Optional[str] = None, limit: int = 50) -> List[Trade]:
@@ -188,13 +194,16 @@ class DatabaseManager:
     def get_recent_trades(self, symbol: Optional[str] = None, limit: int = 50) -> List[Trade]:
         return self.get_trades(symbol=symbol, limit=limit)
 
-    def get_open_trades(self) -> List[Trade]:
-        with self.get_session() as session:
-            return session.query(Trade).filter(Trade.status == 'open').all()
+    def get_open_trades(self, virtual: Optional[bool] = None) -> List[Trade]:
+        return self.get_trades_by_status('open', virtual=virtual)
 
-    def get_trades_by_status(self, status: str) -> List[Trade]:
+    def get_trades_by_status(self, status: str, virtual: Optional[bool] = None) -> List[Trade]:
+        # Mode filter runs in SQL, so callers wanting one mode never load the other's rows
         with self.get_session() as session:
-            return session.query(Trade).filter(Trade.status == status).all()
+            query = session.query(Trade).filter(Trade.status == status)
+            if virtual is not None:
+                query = query.filter(Trade.virtual == virtual)
+            return query.all()
 
     def get_real_trades(self, symbol: Optional[str] = None, limit: int = 50) -> List[Trade]:
         with self.get_session() as session:
@@ -211,6 +220,7 @@ class DatabaseManager:
                 trade.pnl = pnl
                 trade.status = 'closed'
                 session.commit()
+                self._daily_pnl = None
 
     def update_trade_unrealized_pnl(self, order_id: str, unrealized_pnl: float) -> None:
         with self.get_session() as session:
@@ -284,15 +294,28 @@ class DatabaseManager:
             "timestamp": str(datetime.now())
         }
 
+    def _utc_day_start(self) -> datetime:
+        # Recomputed only when the UTC day rolls over; naive, like the stored trade timestamps
+        day = int(time.time() // 86400)
+        if day != self._day_start[0]:
+            self._day_start = (day, datetime.fromtimestamp(day * 86400, timezone.utc).replace(tzinfo=None))
+        return self._day_start[1]
+
     def get_daily_pnl_pct(self) -> float:
+        # The dashboard polls this; the sum only moves when a trade is added or closed,
+        # which drops the cached value, so a short TTL only bounds other writers
+        today = self._utc_day_start()
+        cached = self._daily_pnl
+        if cached is not None and cached[0] == today and time.monotonic() - cached[1] < DAILY_PNL_TTL:
+            return cached[2]
         with self.get_session() as session:
-            today = datetime.now().date()
-            trades = session.query(Trade).filter(
+            # Summed by the database: one scalar back instead of every trade row for the day
+            total_pnl = session.query(func.coalesce(func.sum(Trade.pnl), 0.0)).filter(
                 Trade.timestamp >= today,
                 Trade.pnl.isnot(None)
-            ).all()
-            total_pnl = sum([trade.pnl for trade in trades if trade.pnl])
-            return total_pnl
+            ).scalar()
+            self._daily_pnl = (today, time.monotonic(), float(total_pnl))
+            return float(total_pnl)
 
     def get_trades_count(self) -> int:
         with self.get_session() as session:
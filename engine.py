@@ -1,17 +1,16 @@
 import os
 import sys
+import numpy as np
 import pandas as pd
 import time
-import json
 import logging
 import uuid
 from datetime import datetime, timezone, timedelta
 from dotenv import load_dotenv
 from typing import Any, List, Union, Optional
 from db import db_manager
-from bybit_client import BybitClient
-from utils import get_current_price
-import portalocker
+from bybit_client import BybitClient, DEFAULT_CAPITAL
+from utils import get_current_price, get_current_prices_safe, get_json_store
 
 load_dotenv()
 # Configure logging
@@ -25,8 +24,12 @@ class TradingEngine:
     def __init__(self):
         logger.info("[Engine] Initializing TradingEngine...")
         self.client = BybitClient()
+        # Bound once; price lookups run per trade and per fallback signal
+        self._get_current_price = self.client.get_current_price
         self.db = db_manager
         self.capital_file = "capital.json"
+        # Same in-memory copy BybitClient uses, so neither overwrites the other's updates on flush
+        self._capital = get_json_store(self.capital_file, DEFAULT_CAPITAL)
 
     def get_settings(self):
         scan_interval = self.db.get_setting("SCAN_INTERVAL")
@@ -42,35 +45,34 @@ class TradingEngine:
     def get_usdt_symbols(self):
         try:
             symbols = self.client.get_symbols()
-            usdt_symbols = [s["symbol"] for s in symbols if s["symbol"].endswith("USDT")]
+            # get_symbols already keeps only USDT pairs
+            usdt_symbols = [s["symbol"] for s in symbols]
             return usdt_symbols[:50]
         except Exception as e:
             logger.error(f"Error getting USDT symbols: {e}")
             return ["BTCUSDT", "ETHUSDT", "DOGEUSDT", "SOLUSDT", "XRPUSDT"]
 
     def get_open_real_trades(self):
-        trades = self.db.get_open_trades()
-        return [trade for trade in trades if not trade.virtual]
+        return self.db.get_open_trades(virtual=False)
 
     def get_open_virtual_trades(self):
-        trades = self.db.get_open_trades()
-        return [trade for trade in trades if trade.virtual]
+        return self.db.get_open_trades(virtual=True)
 
     def get_closed_real_trades(self):
-        trades = self.db.get_trades_by_status('closed')
-        return [trade for trade in trades if not trade.virtual]
+        return self.db.get_trades_by_status('closed', virtual=False)
 
     def get_closed_virtual_trades(self):
-        trades = self.db.get_trades_by_status('closed')
-        return [trade for trade in trades if trade.virtual]
+        return self.db.get_trades_by_status('closed', virtual=True)
 
     def get_trade_statistics(self):
         all_trades = self.db.get_trades(limit=1000)
         if not all_trades:
             return {}
         total_trades = len(all_trades)
-        profitable_trades = sum(1 for t in all_trades if t.pnl and t.pnl > 0)
-        total_pnl = sum(t.pnl for t in all_trades if t.pnl)
+        # One column of P&L, then both aggregates are single vectorized passes
+        pnl = np.fromiter((t.pnl or 0.0 for t in all_trades), dtype=np.float64, count=total_trades)
+        profitable_trades = int(np.count_nonzero(pnl > 0))
+        total_pnl = float(pnl.sum())
         return {
             "total_trades": total_trades,
             "profitable_trades": profitable_trades,
@@ -80,22 +82,18 @@ class TradingEngine:
 
     def calculate_virtual_pnl(self, trade):
         try:
-            current_price = self.client.get_current_price(trade.get("symbol", ""))
+            current_price = self._get_current_price(trade.get("symbol", ""))
             entry_price = float(trade.get("entry_price", 0))
             qty = float(trade.get("qty", 0))
-            side = trade.get("side", "Buy").upper()
-            if side == "BUY":
-                pnl = (current_price - entry_price) * qty
-            else:
-                pnl = (entry_price - current_price) * qty
-            return pnl
+            sign = 1 if trade.get("side", "Buy").upper() == "BUY" else -1
+            return sign * (current_price - entry_price) * qty
         except Exception as e:
             logger.error(f"Error calculating virtual PnL: {e}")
             return 0.0
 
     def get_ticker(self, symbol):
         try:
-            price = self.client.get_current_price(symbol)
+            price = self._get_current_price(symbol)
             return {"lastPrice": price}
         except Exception as e:
             logger.error(f"Error getting ticker for {symbol}: {e}")
@@ -136,12 +134,10 @@ class TradingEngine:
                     leverage = signal.get("leverage", 10)
                     side = signal["side"]
 
-                    if side == "Buy":
-                        trail_price = entry_price + (signal["tp"] - entry_price) * 0.5
-                        liquidation_price = entry_price * (1 - 0.8 / leverage)
-                    else:
-                        trail_price = entry_price - (entry_price - signal["tp"]) * 0.5
-                        liquidation_price = entry_price * (1 + 0.8 / leverage)
+                    sign = 1 if side == "Buy" else -1
+                    # Halfway to TP on either side; liquidation mirrored around entry
+                    trail_price = entry_price + (signal["tp"] - entry_price) * 0.5
+                    liquidation_price = entry_price * (1 - sign * 0.8 / leverage)
 
                     signal_data = {
                         "symbol": signal["symbol"],
@@ -175,9 +171,11 @@ class TradingEngine:
 
             # Fallback demo signals
             if not signals:
+                # One tickers snapshot for the fallback symbols rather than a request each
+                fallback_prices = get_current_prices_safe(symbols[:2], self.client)
                 for symbol in symbols[:2]:
                     try:
-                        current_price = self.client.get_current_price(symbol)
+                        current_price = fallback_prices.get(symbol, 0.0)
                         if not current_price:
                             logger.warning(f"No price data for {symbol}")
                             continue
@@ -308,35 +306,22 @@ class TradingEngine:
 
     def load_capital(self, mode="all"):
         try:
-            with open(self.capital_file, "r") as f:
-                portalocker.lock(f, portalocker.LOCK_SH)
-                capital_data = json.load(f)
-                portalocker.unlock(f)
-                if mode == "all":
-                    return capital_data
-                return capital_data.get(mode, {})
-        except FileNotFoundError:
-            default_capital = {
-                "real": {"capital": 0.0, "available": 0.0, "used": 0.0, "start_balance": 0.0, "currency": "USDT"},
-                "virtual": {"capital": 100.0, "available": 100.0, "used": 0.0, "start_balance": 100.0, "currency": "USDT"}
-            }
-            self.save_capital("all", default_capital)
-            return default_capital if mode == "all" else default_capital.get(mode, {})
+            capital_data = self._capital.snapshot()
+            if mode == "all":
+                return capital_data
+            return capital_data.get(mode, {})
         except Exception as e:
             logger.error(f"Error loading capital: {e}")
             return {}
 
     def save_capital(self, mode, capital_data):
         try:
-            all_capital = self.load_capital("all") if mode != "all" else {}
-            if mode != "all":
-                all_capital[mode] = capital_data
-            else:
-                all_capital = capital_data
-            with open(self.capital_file, "w") as f:
-                portalocker.lock(f, portalocker.LOCK_EX)
-                json.dump(all_capital, f, indent=4)
-                portalocker.unlock(f)
+            with self._capital.edit() as all_capital:
+                if mode == "all":
+                    all_capital.clear()
+                    all_capital.update(capital_data)
+                else:
+                    all_capital[mode] = capital_data
         except Exception as e:
             logger.error(f"Error saving capital: {e}")
 
@@ -0,0 +1,35 @@
+import atexit
+import logging
+import queue
+import sys
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+LOG_FILE = "app.log"
+LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+_listener: QueueListener = None
+
+def configure_logging(level: int = logging.INFO, stream: bool = True) -> None:
+    """
+    Route root logging through a QueueHandler so callers only enqueue records;
+    a background QueueListener does the file/stdout writes. Safe to call on
+    every Streamlit rerun - the listener is only started once per process.
+    """
+    global _listener
+    root = logging.getLogger()
+    root.setLevel(level)
+    if _listener is not None:
+        return
+
+    formatter = logging.Formatter(LOG_FORMAT)
+    handlers = [RotatingFileHandler(LOG_FILE, maxBytes=5_000_000, backupCount=3, delay=True, encoding="utf-8")]
+    if stream:
+        handlers.append(logging.StreamHandler(sys.stdout))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    log_queue = queue.Queue(-1)
+    root.addHandler(QueueHandler(log_queue))
+    _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
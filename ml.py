@@ -1,4 +1,6 @@
 import os
+import threading
+from collections import OrderedDict
 import numpy as np
 import pandas as pd
 import joblib
@@ -17,12 +19,17 @@ from db import db
 
 MODEL_PATH = os.getenv("ML_MODEL_PATH", "models/market_model.pkl")
 ML_ENABLED = os.getenv("ML_ENABLED", "true").lower() == "true"
+SCORE_CACHE_SIZE = 4096
+FEATURE_DECIMALS = 4  # features are quantized to this many decimals before fingerprinting
 
 class MLFilter:
     def __init__(self):
         self.model = self._load_model() if ML_ENABLED else None
         self.db = db
         self._last_training_size = 0
+        # Feature fingerprint -> win probability, so repeated setups skip the forward pass
+        self._score_cache: "OrderedDict[bytes, float]" = OrderedDict()
+        self._score_lock = threading.Lock()
 
     def _load_model(self):
         if os.path.exists(MODEL_PATH):
@@ -52,13 +59,58 @@ class MLFilter:
             signal["confidence"] = int(min(signal["score"] + np.random.uniform(5, 20), 100))
         elif self.model:
             features = self.extract_features(signal).reshape(1, -1)
-            prob = self.model.predict_proba(features)[0][1]
+            prob = self._predict_probs(features)[0]
             signal["score"] = round(prob * 100, 2)
             signal["confidence"] = int(min(signal["score"] + np.random.uniform(0, 10), 100))
         else:
             signal["score"] = signal.get("score", np.random.uniform(55, 70))
             signal["confidence"] = int(min(signal["score"] + np.random.uniform(5, 20), 100))
 
+        return self._apply_margin(signal, trading_mode)
+
+    def enhance_batch(self, signals: list, trading_mode: str = "virtual") -> list:
+        """Score all signals with one model forward pass instead of one call per signal."""
+        if not signals:
+            return signals
+        if not (ML_ENABLED and self.model):
+            return [self.enhance_signal(signal, trading_mode) for signal in signals]
+
+        features = np.stack([self.extract_features(signal) for signal in signals])
+        probs = self._predict_probs(features)
+        jitter = np.random.uniform(0, 10, len(signals))
+        for signal, prob, bump in zip(signals, probs, jitter):
+            signal["score"] = round(float(prob) * 100, 2)
+            signal["confidence"] = int(min(signal["score"] + bump, 100))
+            self._apply_margin(signal, trading_mode)
+        return signals
+
+    def _predict_probs(self, features: np.ndarray) -> np.ndarray:
+        """Win probabilities for each feature row; only rows not seen recently reach the model."""
+        features = np.asarray(features, dtype=np.float64)
+        keys = [row.tobytes() for row in features.round(FEATURE_DECIMALS)]
+        probs = np.empty(len(keys))
+        misses = []
+        with self._score_lock:
+            for i, key in enumerate(keys):
+                prob = self._score_cache.get(key)
+                if prob is None:
+                    misses.append(i)
+                else:
+                    self._score_cache.move_to_end(key)
+                    probs[i] = prob
+        if misses:
+            # XGBoost evaluates splits in float32; hand it a contiguous float32 block so it
+            # doesn't copy/convert the float64 features itself
+            batch = np.ascontiguousarray(features[misses], dtype=np.float32)
+            probs[misses] = self.model.predict_proba(batch)[:, 1]
+            with self._score_lock:
+                for i in misses:
+                    self._score_cache[keys[i]] = probs[i]
+                while len(self._score_cache) > SCORE_CACHE_SIZE:
+                    self._score_cache.popitem(last=False)
+        return probs
+
+    def _apply_margin(self, signal: dict, trading_mode: str) -> dict:
         try:
             entry_price = float(signal.get("entry", 0))
             leverage = int(signal.get("leverage", 20))
@@ -168,6 +220,8 @@ class MLFilter:
             os.makedirs(os.path.dirname(MODEL_PATH), exist_ok=True)
             joblib.dump(model, MODEL_PATH)
             self.model = model
+            with self._score_lock:
+                self._score_cache.clear()
 
             acc = model.score(X_test, y_test)
             train_acc = model.score(X_train, y_train)
@@ -214,10 +268,12 @@ class MLFilter:
         try:
             data = self.load_data_from_db()
             df = pd.DataFrame(data)
+            # Vectorized column sum, taken once for both stats
+            profitable = int(df["profit"].to_numpy().sum()) if not df.empty else 0
             stats.update({
                 "total_records": len(df),
-                "profitable_records": int(sum(df["profit"])) if not df.empty else 0,
-                "profit_rate": float(sum(df["profit"]) / len(df)) if not df.empty else 0,
+                "profitable_records": profitable,
+                "profit_rate": float(profitable / len(df)) if not df.empty else 0,
                 "trades_count": self.db.get_trades_count(),
                 "signals_count": self.db.get_signals_count()
             })
@@ -225,6 +281,18 @@ class MLFilter:
             stats["error"] = str(e)
         return stats
 
+_ml_filter = None
+_ml_filter_lock = threading.Lock()
+
+def get_ml() -> MLFilter:
+    """Process-wide MLFilter, so the model is loaded once and its score cache is shared."""
+    global _ml_filter
+    if _ml_filter is None:
+        with _ml_filter_lock:
+            if _ml_filter is None:
+                _ml_filter = MLFilter()
+    return _ml_filter
+
 if __name__ == "__main__":
     ml = MLFilter()
     logger.info(f"[ML] 📊 Current model stats: {ml.get_model_stats()}")
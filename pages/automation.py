@@ -8,7 +8,7 @@ from typing import Dict, Optional, List
 from bybit_client import BybitClient
 from engine import TradingEngine
 from db import db_manager
-from ml import MLFilter
+from ml import get_ml
 import pandas as pd
 from utils import format_currency_safe, display_trades_table, get_trades_safe
 from dotenv import load_dotenv
@@ -37,7 +37,7 @@ class AutomatedTrader:
         self.start_time = None
         self.engine = engine
         self.client = client
-        self.ml_filter = MLFilter() if os.getenv("ML_ENABLED", "true").lower() == "true" else None
+        self.ml_filter = get_ml() if os.getenv("ML_ENABLED", "true").lower() == "true" else None
         self.risk_per_trade = risk_per_trade
         self.min_sl_points = float(os.getenv("MIN_SL_POINTS", "10"))
         self.max_sl_points = float(os.getenv("MAX_SL_POINTS", "100"))
@@ -230,7 +230,9 @@ class AutomatedTrader:
         if self.start_time:
             uptime = datetime.now(timezone.utc) - self.start_time
             with self.stats_lock:
-                self.stats["uptime"] = str(uptime).split(".")[0]
+                hours, rem = divmod(int(uptime.total_seconds()), 3600)
+                minutes, seconds = divmod(rem, 60)
+                self.stats["uptime"] = f"{hours}:{minutes:02d}:{seconds:02d}"
 
     def get_status(self) -> Dict:
         with self.stats_lock:
@@ -329,11 +331,16 @@ def show_automation(automated_trader, db, engine, client, trading_mode: str):
                 st.metric("Failed Trades", status["stats"]["failed_trades"])
                 st.metric("Uptime", status["stats"]["uptime"])
 
+@st.cache_resource(show_spinner=False)
+def get_automated_trader():
+    """One engine/trader pair per server process, so reruns never orphan running loops."""
+    engine = TradingEngine()
+    return engine, AutomatedTrader(engine, engine.client)
+
 # Initialize components
 db = db_manager
-engine = TradingEngine()
+engine, automated_trader = get_automated_trader()
 client = engine.client
-automated_trader = AutomatedTrader(engine, client)
 
 # Set trading mode via radio button
 st.session_state.trading_mode = st.radio(
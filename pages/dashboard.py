@@ -1,8 +1,9 @@
 import streamlit as st
 import pandas as pd
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
-from typing import List, Optional, Dict
+from typing import Any, List, Optional, Dict
 from bybit_client import BybitClient
 from engine import TradingEngine
 from db import db_manager
@@ -11,25 +12,24 @@ from utils import format_price_safe, format_currency_safe, display_trades_table
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO, filename="app.log", filemode="a", format="%(asctime)s - %(levelname)s - %(message)s", encoding="utf-8")
 
+EXCLUDED_SYMBOLS = frozenset(("1000000BABYDOGEUSDT", "1000000CHEEMSUSDT", "1000000MOGUSDT"))
+
 def get_trades_safe(db, symbol: Optional[str] = None, limit: int = 50) -> List[Dict]:
     """
     Safely fetch trades from the database and normalize them into dicts.
     Filters out unwanted meme-coins.
     """
     try:
-        if not db or not hasattr(db, "get_trades"):
+        get_trades = getattr(db, "get_trades", None) if db else None
+        if not get_trades:
             logger.error("❌ db has no method 'get_trades'")
             return []
 
-        trades = db.get_trades(symbol=symbol, limit=limit) or []
-
-        # Normalize to dict
-        normalized = []
-        for t in trades:
-            if getattr(t, "symbol", "N/A") in ["1000000BABYDOGEUSDT", "1000000CHEEMSUSDT", "1000000MOGUSDT"]:
-                continue
+        trades = get_trades(symbol=symbol, limit=limit) or []
 
-            normalized.append({
+        # Normalize to dicts in one comprehension
+        return [
+            {
                 "id": getattr(t, "id", None),
                 "symbol": getattr(t, "symbol", "N/A"),
                 "side": getattr(t, "side", "Buy"),
@@ -39,44 +39,73 @@ def get_trades_safe(db, symbol: Optional[str] = None, limit: int = 50) -> List[D
                 "status": getattr(t, "status", "N/A"),
                 "virtual": getattr(t, "virtual", True),
                 "timestamp": str(getattr(t, "timestamp", "")),
-            })
-
-        return normalized
+            }
+            for t in trades
+            if getattr(t, "symbol", "N/A") not in EXCLUDED_SYMBOLS
+        ]
 
     except Exception as e:
         logger.error(f"🚨 Error fetching trades (symbol={symbol}): {e}")
         return []
 
+def fetch_dashboard_data(db, engine, client, trading_mode: str) -> Dict[str, Any]:
+    """
+    Run the independent dashboard lookups concurrently so the page waits for
+    the slowest one instead of their sum. A failing lookup falls back to its
+    empty default rather than blanking the page.
+    """
+    fetchers = {
+        "capital": lambda: engine.load_capital(trading_mode),
+        "open_trades": db.get_open_trades,
+        "daily_pnl": db.get_daily_pnl_pct,
+        "trades": lambda: get_trades_safe(db),
+        "market": client.get_tickers,
+    }
+    defaults = {"capital": {}, "open_trades": [], "daily_pnl": 0.0, "trades": [], "market": []}
+
+    with ThreadPoolExecutor(max_workers=len(fetchers)) as pool:
+        futures = {key: pool.submit(fetch) for key, fetch in fetchers.items()}
+
+    results = {}
+    for key, future in futures.items():
+        try:
+            results[key] = future.result() or defaults[key]
+        except Exception as e:
+            logger.error(f"🚨 Error fetching dashboard {key}: {e}")
+            results[key] = defaults[key]
+    return results
+
 def show_dashboard(db, engine, client, trading_mode: str):
     st.title("📈 Dashboard")
+    with st.spinner("Fetching dashboard data..."):
+        data = fetch_dashboard_data(db, engine, client, trading_mode)
     overview_tab, market_tab, trades_tab = st.tabs(["📊 Overview", "🌐 Market", "📋 Trades"])
 
     with overview_tab:
         with st.container(border=True):
             st.subheader("Portfolio Overview")
-            portfolio_balance = engine.load_capital(trading_mode)
+            portfolio_balance = data["capital"]
             total_balance = portfolio_balance.get("capital", 0.0)
-            open_positions = len(db.get_open_trades())
-            daily_pnl = db.get_daily_pnl_pct()
-            trades = get_trades_safe(db)
-            col1, col2, col3, col4 = st.columns(4)
-            with col1:
-                st.metric("Portfolio Balance", f"{format_currency_safe(total_balance)}")
-            with col2:
-                st.metric("Open Positions", open_positions)
-            with col3:
-                st.metric("Daily P&L", f"{format_currency_safe(daily_pnl)}", 
-                         delta=f"{daily_pnl:+.2f}", 
-                         delta_color="normal" if daily_pnl >= 0 else "inverse")
-            with col4:
-                st.metric("Total Trades", len(trades))
+            open_positions = len(data["open_trades"])
+            daily_pnl = data["daily_pnl"]
+            trades = data["trades"]
+            # Precompute every metric, then render them in a single pass over the columns
+            metrics = [
+                {"label": "Portfolio Balance", "value": format_currency_safe(total_balance)},
+                {"label": "Open Positions", "value": open_positions},
+                {"label": "Daily P&L", "value": format_currency_safe(daily_pnl),
+                 "delta": f"{daily_pnl:+.2f}",
+                 "delta_color": "normal" if daily_pnl >= 0 else "inverse"},
+                {"label": "Total Trades", "value": len(trades)},
+            ]
+            for col, metric in zip(st.columns(len(metrics)), metrics):
+                col.metric(**metric)
             if st.button("🔄 Refresh Metrics", key="refresh_metrics_overview_tab"):
                 st.rerun()
 
     with market_tab:
         st.subheader("🌐 Market Overview")
-        with st.spinner("Fetching market data..."):
-            market_data = client.get_tickers()
+        market_data = data["market"]
         if market_data:
             cols = st.columns(min(6, len(market_data)))
             for i, ticker in enumerate(market_data[:6]):
@@ -104,7 +133,7 @@ def show_dashboard(db, engine, client, trading_mode: str):
 
     with trades_tab:
         st.subheader("📋 Recent Trades")
-        display_trades_table(get_trades_safe(db), st, client)
+        display_trades_table(data["trades"], st, client)
         if st.button("🔄 Refresh Trades", key="trades_refresh_data"):
             st.rerun()
 
@@ -1,19 +1,29 @@
 import streamlit as st
+import streamlit.components.v1 as components
 import logging
 import pandas as pd
-from datetime import datetime
-from ml import MLFilter
+from ml import get_ml
 from utils import format_currency_safe
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, filename="app.log", filemode="a", format="%(asctime)s - %(levelname)s - %(message)s", encoding="utf-8")
 logger = logging.getLogger(__name__)
 
+CLOCK_HTML = """
+<span id="clk" style="color:#a0a0c0;font-family:'Segoe UI',sans-serif;font-size:14px;"></span>
+<script>
+const clk = document.getElementById("clk");
+const tick = () => { clk.innerText = "Last Updated: " + new Date().toLocaleString(); };
+tick();
+setInterval(tick, 1000);
+</script>
+"""
+
 def show_ml(db, engine, client, trading_mode: str):
     st.title("🧠 Machine Learning")
     st.markdown("---")
 
-    ml_filter = MLFilter()
+    ml_filter = get_ml()
     st.subheader("Model Status")
     model_stats = ml_filter.get_model_stats()
     col1, col2, col3 = st.columns(3)
@@ -24,7 +34,8 @@ def show_ml(db, engine, client, trading_mode: str):
     with col3:
         st.metric("Profit Rate", f"{model_stats.get('profit_rate', 0):.2%}")
     st.caption(f"Model Path: {model_stats.get('model_path', 'N/A')}")
-    st.caption(f"Last Updated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    # Ticks in the browser so the timestamp never needs a server rerun
+    components.html(CLOCK_HTML, height=24)
 
     st.markdown("---")
     st.subheader("Model Training")
@@ -6,17 +6,12 @@ from typing import List, Optional
 from bybit_client import BybitClient
 from engine import TradingEngine
 from db import db_manager
-from utils import format_price_safe, format_currency_safe, display_trades_table, get_trades_safe
+from utils import format_price_safe, format_currency_safe, display_trades_table, get_trades_safe, get_current_prices_safe
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO, filename="app.log", filemode="a", format="%(asctime)s - %(levelname)s - %(message)s", encoding="utf-8")
 
-def get_current_price_safe(symbol: str, client: BybitClient) -> float:
-    try:
-        return client.get_current_price(symbol)
-    except Exception as e:
-        logger.error(f"Error getting price for {symbol}: {e}")
-        return 0.0
+LONG_SIDES = frozenset(("Buy", "LONG"))
 
 def show_orders(db, engine, client, trading_mode: str):
     st.title("📋 Orders")
@@ -30,21 +25,28 @@ def show_orders(db, engine, client, trading_mode: str):
         </style>
     """, unsafe_allow_html=True)
     is_virtual = trading_mode == "virtual"
+    # One fetch and one pass split the trades between both tabs
+    trades_by_status = {"open": [], "closed": []}
+    for t in get_trades_safe(db):
+        if t.get('virtual', True) == is_virtual:
+            trades_by_status.get((t.get('status') or '').lower(), []).append(t)
     open_tab, closed_tab = st.tabs(["🟢 Open Orders", "🔴 Closed Orders"])
 
     with open_tab:
         st.subheader("🟢 Open Orders")
-        open_trades = [t for t in get_trades_safe(db) if getattr(t, 'status', '').lower() == 'open' and getattr(t, 'virtual', True) == is_virtual]
+        open_trades = trades_by_status["open"]
         if open_trades:
+            # One tickers request for every open symbol instead of a round-trip per card
+            prices = get_current_prices_safe((t.get('symbol', 'N/A') for t in open_trades), client)
             for index, trade in enumerate(open_trades):
                 with st.container(border=True):
-                    symbol = getattr(trade, 'symbol', 'N/A')
-                    side = getattr(trade, 'side', 'Buy')
-                    is_virtual_trade = getattr(trade, 'virtual', True)
-                    qty = float(getattr(trade, 'qty', 0))
-                    entry_price = float(getattr(trade, 'entry_price', 0))
-                    current_price = get_current_price_safe(symbol, client)
-                    unreal_pnl = (current_price - entry_price) * qty if side in ["Buy", "LONG"] else (entry_price - current_price) * qty
+                    symbol = trade.get('symbol', 'N/A')
+                    side = trade.get('side', 'Buy')
+                    is_virtual_trade = trade.get('virtual', True)
+                    qty = float(trade.get('qty', 0))
+                    entry_price = float(trade.get('entry_price', 0))
+                    current_price = prices.get(symbol, 0.0)
+                    unreal_pnl = (1 if side in LONG_SIDES else -1) * (current_price - entry_price) * qty
                     st.markdown(f"**{symbol} | {side} | {'🟢 Virtual' if is_virtual_trade else '🔴 Real'}**")
                     col1, col2, col3 = st.columns(3)
                     with col1:
@@ -56,7 +58,7 @@ def show_orders(db, engine, client, trading_mode: str):
                                  delta=f"{unreal_pnl:+.2f}", 
                                  delta_color="normal" if unreal_pnl >= 0 else "inverse")
                     with col3:
-                        order_id = getattr(trade, 'order_id', None)
+                        order_id = trade.get('order_id')
                         if order_id:
                             if st.button("❌ Close", key=f"close_order_{order_id}_{index}"):
                                 logger.info(f"Attempting to close order: {order_id}, symbol={symbol}, side={side}, qty={qty}")
@@ -77,8 +79,7 @@ def show_orders(db, engine, client, trading_mode: str):
 
     with closed_tab:
         st.subheader("🔴 Closed Orders")
-        closed_trades = [t for t in get_trades_safe(db) if getattr(t, 'status', '').lower() == 'closed' and getattr(t, 'virtual', True) == is_virtual]
-        display_trades_table(closed_trades, st, client)
+        display_trades_table(trades_by_status["closed"], st, client)
         if st.button("🔄 Refresh Closed Orders", key="refresh_closed_orders"):
             st.rerun()
 
@@ -1,23 +1,27 @@
 import streamlit as st
 import logging
+import numpy as np
 import pandas as pd
-from typing import List, Optional, Dict
+from typing import List, Optional, Dict, Tuple
 from bybit_client import BybitClient
 from engine import TradingEngine
 from db import db_manager
 from datetime import datetime, timezone
-from utils import format_price_safe, format_currency_safe, display_trades_table, get_trades_safe
+from utils import format_price_safe, format_currency_safe, display_trades_table, get_trades_safe, get_current_prices_safe
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO, filename="app.log", filemode="a", format="%(asctime)s - %(levelname)s - %(message)s", encoding="utf-8")
 
-def get_current_price_safe(symbol: str, client: BybitClient) -> float:
-    """Safely get the current price for a symbol."""
-    try:
-        return client.get_current_price(symbol)
-    except Exception as e:
-        logger.error(f"Error getting price for {symbol}: {e}")
-        return 0.0
+EXCLUDED_SYMBOLS = frozenset(("1000000BABYDOGEUSDT", "1000000CHEEMSUSDT", "1000000MOGUSDT"))
+
+def holding_values(qty: np.ndarray, avg_price: np.ndarray, current_price: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Market value and unrealized P&L of every holding in one pass over the columns.
+    Unpriced holdings are worth 0; holdings without an average price report 0 P&L.
+    """
+    value = np.where((qty != 0) & (current_price != 0), qty * current_price, 0.0)
+    unrealized = np.where((qty != 0) & (avg_price != 0), value - qty * avg_price, 0.0)
+    return value, unrealized
 
 def get_portfolio_balance(db, client: BybitClient, trading_mode: str) -> Dict:
     """Calculate portfolio balance and metrics."""
@@ -26,26 +30,21 @@ def get_portfolio_balance(db, client: BybitClient, trading_mode: str) -> Dict:
         portfolio_holdings = db.get_portfolio() or []
         capital_data = client.load_capital(trading_mode)
         total_capital = float(capital_data.get("capital", 100.0 if is_virtual else 0.0))
-        total_value = 0.0
-        unrealized_pnl = 0.0
-        used_margin = 0.0
-        open_positions = 0
-
-        for holding in portfolio_holdings:
-            if getattr(holding, 'is_virtual', True) != is_virtual:
-                continue
-            symbol = getattr(holding, 'symbol', None)
-            if not symbol or symbol in ["1000000BABYDOGEUSDT", "1000000CHEEMSUSDT", "1000000MOGUSDT"]:
-                continue
-            qty = float(getattr(holding, 'qty', 0) or 0)
-            avg_price = float(getattr(holding, 'avg_price', 0) or 0)
-            current_price = get_current_price_safe(symbol, client)
-            value = qty * current_price if qty and current_price else 0
-            holding_unrealized_pnl = value - (qty * avg_price) if qty and avg_price else 0
-            total_value += value
-            unrealized_pnl += holding_unrealized_pnl
-            used_margin += float(getattr(holding, 'margin_usdt', 0) or 0)
-            open_positions += 1
+        holdings = [
+            h for h in portfolio_holdings
+            if getattr(h, 'is_virtual', True) == is_virtual
+            and getattr(h, 'symbol', None) and h.symbol not in EXCLUDED_SYMBOLS
+        ]
+        prices = get_current_prices_safe((h.symbol for h in holdings), client)
+        n = len(holdings)
+        qty = np.fromiter((float(getattr(h, 'qty', 0) or 0) for h in holdings), dtype=np.float64, count=n)
+        avg_price = np.fromiter((float(getattr(h, 'avg_price', 0) or 0) for h in holdings), dtype=np.float64, count=n)
+        current_price = np.fromiter((prices.get(h.symbol, 0.0) for h in holdings), dtype=np.float64, count=n)
+        value, holding_unrealized_pnl = holding_values(qty, avg_price, current_price)
+        total_value = float(value.sum())
+        unrealized_pnl = float(holding_unrealized_pnl.sum())
+        used_margin = float(np.fromiter((float(getattr(h, 'margin_usdt', 0) or 0) for h in holdings), dtype=np.float64, count=n).sum())
+        open_positions = n
 
         available_balance = total_capital - used_margin
         return {
@@ -137,6 +136,7 @@ def show_portfolio(db, engine: TradingEngine, client: BybitClient, trading_mode:
         st.subheader("Portfolio Holdings")
         portfolio_holdings = get_portfolio_safe(db)
         if portfolio_holdings:
+            prices = get_current_prices_safe((getattr(h, 'symbol', 'N/A') for h in portfolio_holdings), client)
             for holding in portfolio_holdings:
                 with st.container(border=True):
                     symbol = getattr(holding, 'symbol', 'N/A')
@@ -152,7 +152,7 @@ def show_portfolio(db, engine: TradingEngine, client: BybitClient, trading_mode:
                         st.markdown(f"**Quantity**: {qty:.6f}")
                         st.metric("Avg Price", f"${format_price_safe(getattr(holding, 'avg_price', 0))}")
                     with col2:
-                        current_price = get_current_price_safe(symbol, client)
+                        current_price = prices.get(symbol, 0.0)
                         value = qty * current_price if qty and current_price else 0
                         unrealized_pnl = value - (qty * float(getattr(holding, 'avg_price', 0) or 0)) if qty else 0
                         st.metric("Value", f"${format_currency_safe(value)}")
@@ -6,30 +6,16 @@ from bybit_client import BybitClient
 from engine import TradingEngine
 from db import db_manager
 import pandas as pd
-from utils import format_price_safe, format_currency_safe, display_trades_table
+from utils import format_price_safe, format_currency_safe, display_trades_table, get_current_price_safe
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO, filename="app.log", filemode="a", format="%(asctime)s - %(levelname)s - %(message)s", encoding="utf-8")
 
-def get_current_price_safe(symbol: str, client: BybitClient) -> float:
-    try:
-        return client.get_current_price(symbol)
-    except Exception as e:
-        logger.error(f"Error getting price for {symbol}: {e}")
-        return 0.0
-
 def get_open_trades_safe(db, trading_mode: str) -> List:
     try:
         is_virtual = (trading_mode.lower() == "virtual")
-        trades = db.get_open_trades() or []
-        filtered = []
-        for t in trades:
-            symbol = getattr(t, "symbol", "N/A")
-            is_virtual_trade = getattr(t, "virtual", True)
-            if symbol not in ["1000000BABYDOGEUSDT", "1000000CHEEMSUSDT", "1000000MOGUSDT"] \
-               and is_virtual_trade == is_virtual:
-                filtered.append(t)
-        return filtered
+        trades = db.get_open_trades(virtual=is_virtual) or []
+        return [t for t in trades if getattr(t, "symbol", "N/A") not in ["1000000BABYDOGEUSDT", "1000000CHEEMSUSDT", "1000000MOGUSDT"]]
     except Exception as e:
         logger.error(f"🚨 Error getting open trades (mode={trading_mode}): {e}")
         return []
@@ -76,11 +62,12 @@ def show_positions(db, engine, client, trading_mode: str):
             col1, col2 = st.columns(2)
             with col1:
                 tp_pct = st.number_input("Take Profit %", value=3.0, min_value=0.1, max_value=100.0, key="pos_tp_pct")
-                tp_price = entry_price * (1 + tp_pct/100) if side == "LONG" else entry_price * (1 - tp_pct/100)
+                sign = 1 if side == "LONG" else -1
+                tp_price = entry_price * (1 + sign * tp_pct/100)
                 st.metric("TP", f"${format_price_safe(tp_price)}")
             with col2:
                 sl_pct = st.number_input("Stop Loss %", value=1.5, min_value=0.1, max_value=100.0, key="pos_sl_pct")
-                sl_price = entry_price * (1 - sl_pct/100) if side == "LONG" else entry_price * (1 + sl_pct/100)
+                sl_price = entry_price * (1 - sign * sl_pct/100)
                 st.metric("SL", f"${format_price_safe(sl_price)}")
             if st.button("🚀 Open Position", type="primary", key="open_position"):
                 try:
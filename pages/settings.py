@@ -1,11 +1,10 @@
 from typing import Dict, Any
-import portalocker
 import streamlit as st
 import os
-import json
+import orjson
 import logging
 from bybit_client import BybitClient
-from utils import format_currency_safe
+from utils import format_currency_safe, atomic_write
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(
@@ -17,6 +16,8 @@ logging.basicConfig(
 )
 
 SETTINGS_FILE = "settings.json"
+WALLET_CACHE_TTL = 15
+CONNECTION_CACHE_TTL = 5
 
 DEFAULT_SETTINGS = {
     "SCAN_INTERVAL": 3600,
@@ -34,10 +35,8 @@ def load_settings() -> Dict[str, Any]:
     """Load settings from file, falling back to defaults."""
     try:
         if os.path.exists(SETTINGS_FILE):
-            with open(SETTINGS_FILE, "r") as f:
-                portalocker.lock(f, portalocker.LOCK_SH)
-                settings = json.load(f)
-                portalocker.unlock(f)
+            with open(SETTINGS_FILE, "rb") as f:
+                settings = orjson.loads(f.read())
             # Merge with defaults
             for key, value in DEFAULT_SETTINGS.items():
                 settings.setdefault(key, value)
@@ -48,18 +47,33 @@ def load_settings() -> Dict[str, Any]:
         return DEFAULT_SETTINGS.copy()
 
 def save_settings(settings: Dict[str, Any]):
-    """Save settings with file lock for concurrency safety."""
+    """Save settings atomically so concurrent readers never see a half-written file."""
     try:
-        with open(SETTINGS_FILE, "w") as f:
-            portalocker.lock(f, portalocker.LOCK_EX)
-            json.dump(settings, f, indent=4)
-            f.flush()
-            os.fsync(f.fileno())
-            portalocker.unlock(f)
+        atomic_write(SETTINGS_FILE, orjson.dumps(settings, option=orjson.OPT_INDENT_2))
     except Exception as e:
         logger.error(f"Error saving settings: {e}")
         raise
 
+@st.cache_data(ttl=WALLET_CACHE_TTL, show_spinner=False)
+def _cached_wallet(_client: BybitClient, mode: str) -> Dict[str, Any]:
+    """Wallet balance for `mode`, reused across reruns within the TTL window."""
+    return _client.get_wallet_balance() or {}
+
+@st.cache_data(ttl=CONNECTION_CACHE_TTL, show_spinner=False)
+def _cached_connected(_client: BybitClient, mode: str) -> bool:
+    """Connection status for `mode`, reused across reruns within the TTL window."""
+    return bool(_client and _client.is_connected())
+
+@st.fragment(run_every=WALLET_CACHE_TTL)
+def wallet_block(client: BybitClient, trading_mode: str):
+    """Balance metric that refreshes on its own timer without rerunning the page."""
+    if trading_mode == "real":
+        balance = _cached_wallet(client, trading_mode)
+        st.metric("Account Balance", format_currency_safe(balance.get('capital', 0.0)))
+    else:
+        balance = client.load_capital("virtual") if client else {"capital": 100.0}
+        st.metric("Virtual Balance", format_currency_safe(balance.get('capital', 100.0)))
+
 def show_settings(db, client: BybitClient, trading_mode: str):
     """Application settings page with tabs and card layout."""
     st.title("⚙️ Settings")
@@ -132,16 +146,19 @@ def show_settings(db, client: BybitClient, trading_mode: str):
                 st.write(f"**Trading Mode**: {trading_mode.capitalize()}")
 
                 if trading_mode == "real":
-                    if client and client.is_connected():
-                        balance = client.get_wallet_balance()
+                    if client and _cached_connected(client, trading_mode):
                         st.write("**API Status**: Connected")
-                        st.metric("Account Balance", format_currency_safe(balance.get('capital', 0.0)))
+                        wallet_block(client, trading_mode)
                         st.info("Real mode balance is managed by Bybit API and cannot be manually updated.")
+                        if st.button("🔄 Refresh Balance", key="refresh_balance_btn"):
+                            _cached_wallet.clear()
+                            _cached_connected.clear()
+                            st.rerun()
                     else:
                         st.error("⚠️ Real mode selected but API credentials are invalid or missing.")
                 else:
                     current_balance = client.load_capital("virtual") if client else {"capital": 100.0}
-                    st.metric("Virtual Balance", format_currency_safe(current_balance.get('capital', 100.0)))
+                    wallet_block(client, trading_mode)
                     new_balance = st.number_input(
                         "Set Virtual Balance (USDT)",
                         value=current_balance.get('capital', 100.0),
@@ -1,4 +1,4 @@
-import json
+import orjson
 import os
 import logging
 from typing import Dict, Any
@@ -27,8 +27,8 @@ def load_settings() -> Dict[str, Any]:
             logger.warning("settings.json not found, using default settings")
             return default_settings
 
-        with open("settings.json", "r") as f:
-            settings = json.load(f)
+        with open("settings.json", "rb") as f:
+            settings = orjson.loads(f.read())
 
         for key, value in default_settings.items():
             if key not in settings:
@@ -57,7 +57,7 @@ def load_settings() -> Dict[str, Any]:
         logger.info("Successfully loaded settings from settings.json")
         return settings
 
-    except json.JSONDecodeError as e:
+    except orjson.JSONDecodeError as e:
         logger.error(f"Error decoding settings.json: {e}, using default settings")
         return default_settings
     except Exception as e:
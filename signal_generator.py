@@ -1,15 +1,15 @@
 from fpdf import FPDF
 from datetime import datetime, timedelta, timezone
 from time import sleep
-import requests
 import sys
-import json
+import orjson
 import argparse
 import logging
 import os
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
-from utils import get_candles, ema, sma, rsi, bollinger, atr, macd, classify_trend, RISK_PCT, ACCOUNT_BALANCE, LEVERAGE, ENTRY_BUFFER_PCT, MIN_VOLUME, MIN_ATR_PCT, RSI_ZONE, INTERVALS, MAX_SYMBOLS
-from ml import MLFilter
+from utils import get_candles, ema, sma, rsi, bollinger, atr, macd, classify_trend, RISK_PCT, ACCOUNT_BALANCE, LEVERAGE, ENTRY_BUFFER_PCT, MIN_VOLUME, MIN_ATR_PCT, RSI_ZONE, INTERVALS, MAX_SYMBOLS, HTTP_SESSION, REQUEST_TIMEOUT, atomic_write
+from ml import get_ml
 from io import BytesIO
 
 load_dotenv()
@@ -24,6 +24,7 @@ TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN", "")
 TELEGRAM_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID", "")
 DEFAULT_SCAN_INTERVAL = int(os.getenv("DEFAULT_SCAN_INTERVAL", 3600))
 ML_ENABLED = os.getenv("ML_ENABLED", "true").lower() == "true"
+SCAN_WORKERS = int(os.getenv("SCAN_WORKERS", 16))
 
 tz_utc3 = timezone(timedelta(hours=3))
 
@@ -32,7 +33,7 @@ def send_discord(message):
     if not DISCORD_WEBHOOK_URL:
         return
     try:
-        requests.post(DISCORD_WEBHOOK_URL, json={"content": message})
+        HTTP_SESSION.post(DISCORD_WEBHOOK_URL, json={"content": message}, timeout=REQUEST_TIMEOUT)
     except Exception as e:
         print(f"Error sending Discord notification: {e}")
 
@@ -41,11 +42,11 @@ def send_telegram(message):
         return
     try:
         url = f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/sendMessage"
-        requests.post(url, data={
+        HTTP_SESSION.post(url, data={
             "chat_id": TELEGRAM_CHAT_ID,
             "text": message,
             "parse_mode": "Markdown"
-        })
+        }, timeout=REQUEST_TIMEOUT)
     except Exception as e:
         print(f"Error sending Telegram notification: {e}")
 
@@ -143,10 +144,12 @@ def analyze(symbol, ml_filter=None, trading_mode="virtual"):
     entry = min(opts, key=lambda x: abs(x - price))
 
     side = 'LONG' if sides[0] == 'LONG' else 'SHORT'
-    tp = round(entry * (1.015 if side == 'LONG' else 0.985), 6)
-    sl = round(entry * (0.985 if side == 'LONG' else 1.015), 6)
-    trail = round(entry * (1 - ENTRY_BUFFER_PCT) if side == 'LONG' else entry * (1 + ENTRY_BUFFER_PCT), 6)
-    liq = round(entry * (1 - 1 / LEVERAGE) if side == 'LONG' else entry * (1 + 1 / LEVERAGE), 6)
+    # +1 long / -1 short: every level is the same formula mirrored around entry
+    sign = 1 if side == 'LONG' else -1
+    tp = round(entry * (1 + sign * 0.015), 6)
+    sl = round(entry * (1 - sign * 0.015), 6)
+    trail = round(entry * (1 - sign * ENTRY_BUFFER_PCT), 6)
+    liq = round(entry * (1 - sign / LEVERAGE), 6)
 
     try:
         risk_amt = ACCOUNT_BALANCE * RISK_PCT
@@ -185,8 +188,8 @@ def analyze(symbol, ml_filter=None, trading_mode="virtual"):
 # Symbol Fetch
 def get_usdt_symbols():
     try:
-        data = requests.get("https://api.bybit.com/v5/market/tickers?category=linear").json()
-        tickers = [i for i in data['result']['list'] if i['symbol'].endswith("USDT")]
+        data = orjson.loads(HTTP_SESSION.get("https://api.bybit.com/v5/market/tickers?category=linear", timeout=REQUEST_TIMEOUT).content)
+        tickers = [i for i in data['result']['list'] if i['symbol'][-4:] == "USDT"]
         tickers.sort(key=lambda x: float(x['turnover24h']), reverse=True)
         return [t['symbol'] for t in tickers[:MAX_SYMBOLS]]
     except Exception as e:
@@ -195,8 +198,10 @@ def get_usdt_symbols():
 
 # Signal Generation
 def generate_signals(symbols, trading_mode="virtual"):
-    ml_filter = MLFilter() if ML_ENABLED else None
-    signals = [analyze(s, ml_filter, trading_mode) for s in symbols]
+    ml_filter = get_ml() if ML_ENABLED else None
+    # analyze() is dominated by kline round-trips; overlap them across symbols on the shared pool
+    with ThreadPoolExecutor(max_workers=SCAN_WORKERS) as pool:
+        signals = list(pool.map(lambda s: analyze(s, ml_filter, trading_mode), symbols))
     signals = [s for s in signals if s]
     signals.sort(key=lambda x: x['Score'], reverse=True)
     return signals
@@ -217,8 +222,8 @@ def main(symbols=None, interval="60", loop=False, trading_mode="virtual"):
             for blk in blocks:
                 print(blk)
 
-            with open("signals.json", "w") as f:
-                json.dump(signals, f, indent=2)
+            # Read back by another process (utils.generate_real_signals): swap it in whole
+            atomic_write("signals.json", orjson.dumps(signals, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
 
             pdf = SignalPDF()
             pdf.add_page()
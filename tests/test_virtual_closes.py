@@ -0,0 +1,93 @@
+import pytest
+
+import bybit_client
+import utils
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    # Fresh capital and trade-log stores in a scratch directory
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("VIRTUAL", "true")
+    monkeypatch.setattr(utils, "_json_stores", {})
+    monkeypatch.setattr(bybit_client, "_open_trade_indexes", {})
+    client = bybit_client.BybitClient()
+    client.prices = {"BTCUSDT": 100.0}
+    client.get_current_price = lambda symbol: client.prices[symbol]
+    client.get_current_prices_batch = lambda symbols: {symbol: client.prices[symbol] for symbol in symbols}
+    return client
+
+
+def test_tick_closes_the_trade_that_hit_its_stop(client):
+    wide = client.place_order("BTCUSDT", "Buy", "Market", 0.01, 100.0, stop_loss=90.0)
+    tight = client.place_order("BTCUSDT", "Buy", "Market", 0.01, 100.0, stop_loss=99.0)
+    client.prices["BTCUSDT"] = 98.0
+
+    still_open = client.tick_virtual_positions()
+
+    assert [t["order_id"] for t in still_open] == [wide["order_id"]]
+    trades = {t["order_id"]: t for t in client._virtual_trades.snapshot()}
+    assert trades[wide["order_id"]]["status"] == "open"
+    closed = trades[tight["order_id"]]
+    assert closed["status"] == "closed"
+    assert closed["exit_reason"] == "stop_loss"
+    assert closed["exit_price"] == 98.0
+    assert closed["pnl"] == pytest.approx(-0.02)
+
+
+def test_close_position_closes_one_matching_trade(client):
+    first = client.place_order("BTCUSDT", "Buy", "Market", 0.01, 100.0)
+    second = client.place_order("BTCUSDT", "Buy", "Market", 0.01, 100.0)
+    client.prices["BTCUSDT"] = 101.0
+
+    assert client.close_position("BTCUSDT", "Buy", 0.01)
+
+    trades = {t["order_id"]: t for t in client._virtual_trades.snapshot()}
+    assert trades[first["order_id"]]["status"] == "closed"
+    assert trades[first["order_id"]]["exit_reason"] == "manual"
+    assert trades[second["order_id"]]["status"] == "open"
+    assert [t["order_id"] for t in client.tick_virtual_positions()] == [second["order_id"]]
+
+
+def test_tick_ignores_orders_placed_while_it_prices(client):
+    first = client.place_order("BTCUSDT", "Buy", "Market", 0.01, 100.0)
+    price_batch = client.get_current_prices_batch
+
+    def place_then_price(symbols):
+        # An order landing between the sweep's snapshot and its price lookup
+        client.place_order("BTCUSDT", "Buy", "Market", 0.02, 100.0)
+        return price_batch(symbols)
+
+    client.get_current_prices_batch = place_then_price
+    assert [t["order_id"] for t in client.tick_virtual_positions()] == [first["order_id"]]
+
+
+def test_close_position_tags_unknown_sides_manual(client):
+    trade = client.place_order("BTCUSDT", "Hold", "Market", 0.01, 100.0, stop_loss=90.0, take_profit=110.0)
+    client.prices["BTCUSDT"] = 100.0
+
+    assert client.close_position("BTCUSDT", "Hold", 0.01)
+
+    closed = {t["order_id"]: t for t in client._virtual_trades.snapshot()}[trade["order_id"]]
+    assert closed["exit_reason"] == "manual"
+
+
+@pytest.mark.parametrize("side, stop_loss, take_profit, exit_price, reason", [
+    ("Buy", 90.0, 110.0, 89.0, "stop_loss"),
+    ("Buy", 90.0, 110.0, 111.0, "take_profit"),
+    ("Sell", 110.0, 90.0, 111.0, "stop_loss"),
+    ("Sell", 110.0, 90.0, 89.0, "take_profit"),
+    ("Buy", 90.0, 110.0, 105.0, "manual"),
+])
+def test_simulate_virtual_closes_matches_close_position(client, side, stop_loss, take_profit, exit_price, reason):
+    client.place_order("BTCUSDT", side, "Market", 0.01, 100.0, stop_loss=stop_loss, take_profit=take_profit)
+    simulated = client.simulate_virtual_closes(client._virtual_trades.snapshot(), [exit_price])
+    client.prices["BTCUSDT"] = exit_price
+
+    assert client.close_position("BTCUSDT", side, 0.01)
+
+    closed = client._virtual_trades.snapshot()[0]
+    assert closed["exit_reason"] == reason
+    assert simulated["exit_reason"] == [reason]
+    assert simulated["pnl"][0] == pytest.approx(closed["pnl"])
+    assert simulated["capital_delta"] == pytest.approx(closed["pnl"])
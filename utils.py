@@ -1,16 +1,24 @@
 import os
-import json
+import orjson
 import logging
 import pandas as pd
 import numpy as np
 import requests
+from requests.adapters import HTTPAdapter
 import subprocess
 import sys
+import atexit
+import copy
+import mmap
+import threading
+import time
+from contextlib import contextmanager
+from functools import lru_cache
 from typing import List, Tuple, Dict, Any, Optional
 from datetime import datetime, timezone
 from dotenv import load_dotenv
+import portalocker
 import streamlit as st
-from tenacity import retry, stop_after_attempt, wait_fixed
 
 load_dotenv()
 # Configure logging
@@ -44,12 +52,302 @@ INTERVALS = os.getenv("INTERVALS", "15,60,240").split(",")
 MAX_SYMBOLS = int(os.getenv("MAX_SYMBOLS", 50))
 
 BASE_URL = "https://api.bybit.com"  # You can change this to testnet if needed
+REQUEST_TIMEOUT = (3, 10)  # (connect, read) seconds
+
+def _build_session() -> requests.Session:
+    # No transport-level retries: get_json's RETRY_BACKOFF loop is the only retry layer,
+    # and order POSTs are never replayed
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=32, pool_maxsize=64, max_retries=0)
+    session.mount("https://", adapter)
+    session.headers.update({"Connection": "keep-alive"})
+    return session
+
+# Shared by BybitClient and the module-level market helpers so every thread reuses one keep-alive pool
+HTTP_SESSION = _build_session()
+# Sleep before each GET attempt; kept short so a transient failure costs well under a second
+RETRY_BACKOFF = (0.0, 0.1, 0.4)
+
+def get_json(url: str, params: Optional[Dict] = None, headers: Optional[Dict] = None, session: Optional[requests.Session] = None) -> Dict:
+    """GET `url` and decode the JSON body, retrying transport errors and non-200 replies with RETRY_BACKOFF."""
+    session = session or HTTP_SESSION
+    error: Exception = RuntimeError(f"No attempts made for {url}")
+    for delay in RETRY_BACKOFF:
+        if delay:
+            time.sleep(delay)
+        try:
+            response = session.get(url, params=params, headers=headers, timeout=REQUEST_TIMEOUT)
+            if response.status_code == 200:
+                return orjson.loads(response.content)
+            error = requests.HTTPError(f"HTTP {response.status_code} from {url}")
+        except (requests.RequestException, orjson.JSONDecodeError) as e:
+            error = e
+    raise error
+
+class TTLCache:
+    """Thread-safe memo whose entries expire `ttl` seconds after they were fetched."""
+
+    LOCK_SHARDS = 16  # power of two so a key's shard is a mask of its hash
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._entries: Dict[Any, Tuple[float, Any]] = {}
+        self._locks = [threading.Lock() for _ in range(self.LOCK_SHARDS)]
+
+    def _lock_for(self, key) -> threading.Lock:
+        return self._locks[hash(key) & (self.LOCK_SHARDS - 1)]
+
+    def _fresh(self, key) -> Optional[Tuple[float, Any]]:
+        entry = self._entries.get(key)
+        if entry is not None and time.monotonic() - entry[0] < self.ttl:
+            return entry
+        return None
+
+    def get_or(self, key, fetch):
+        entry = self._fresh(key)
+        if entry is not None:
+            return entry[1]
+        # Double-checked under the key's shard lock so concurrent misses trigger a single fetch
+        # while misses on keys in other shards proceed in parallel
+        with self._lock_for(key):
+            entry = self._fresh(key)
+            if entry is not None:
+                return entry[1]
+            value = fetch()
+            self._entries[key] = (time.monotonic(), value)
+            return value
+
+    def get(self, key, default=None):
+        """Fresh cached value for key, or default; never fetches."""
+        entry = self._fresh(key)
+        return entry[1] if entry is not None else default
+
+    def put(self, key, value):
+        self._entries[key] = (time.monotonic(), value)
+
+    def invalidate(self, key=None):
+        if key is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(key, None)
+
+def atomic_write(path: str, payload: bytes):
+    """
+    Replace `path` with `payload` in one rename: readers see the old or the new file,
+    never a truncated one. Writers serialize on a sidecar `.lock` file.
+    """
+    tmp = path + ".tmp"
+    with portalocker.Lock(path + ".lock", mode="a", flags=portalocker.LOCK_EX):
+        with open(tmp, "wb") as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+
+class WriteBackJsonFile:
+    """
+    In-memory copy of a JSON file. Reads and edits touch only memory; a background
+    thread writes the file back at most once per flush interval, and again at exit.
+    """
+
+    def __init__(self, path: str, default):
+        self.path = path
+        self._lock = threading.RLock()
+        self._file_lock = threading.Lock()
+        self._dirty = False
+        try:
+            # Writers swap the file in atomically, so reads need no lock
+            with open(path, "rb") as f:
+                self._data = orjson.loads(f.read())
+        except FileNotFoundError:
+            self._data = copy.deepcopy(default)
+            self._dirty = True
+        except Exception as e:
+            logger.error(f"Could not read {path}, starting from defaults: {e}")
+            self._data = copy.deepcopy(default)
+
+    def snapshot(self):
+        with self._lock:
+            return copy.deepcopy(self._data)
+
+    @contextmanager
+    def edit(self):
+        """Mutate the data in place; the change is written out on the next flush."""
+        with self._lock:
+            yield self._data
+            self._dirty = True
+
+    def flush(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            payload = orjson.dumps(self._data, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY)
+            self._dirty = False
+        # Serialized under the data lock; the slow disk write only holds the file lock
+        with self._file_lock:
+            try:
+                atomic_write(self.path, payload)
+            except Exception as e:
+                logger.error(f"Could not write {self.path}: {e}")
+                with self._lock:
+                    self._dirty = True
+
+JSONL_COMPACT_INTERVAL = float(os.getenv("JSONL_COMPACT_INTERVAL", "600"))
+JSONL_COMPACT_RATIO = 4  # compact early once the file holds this many lines per live record
+# Compact lines with the newline written by the encoder, so no per-line bytes concatenation
+JSONL_DUMP_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_APPEND_NEWLINE
+
+class AppendOnlyJsonl:
+    """
+    Record log kept as JSON lines. New records and field updates are each appended as
+    one line, so a write costs the same however long the history is; loading replays
+    the updates, and compaction periodically rewrites the file as plain records.
+    Records must carry an "order_id".
+    """
+
+    def __init__(self, path: str, legacy_path: Optional[str] = None):
+        self.path = path
+        self._lock = threading.RLock()
+        self._records: List[Dict] = []
+        self._positions: Dict[str, int] = {}
+        self._pending_updates = 0
+        self._last_compaction = time.monotonic()
+        try:
+            self._replay_file(path)
+        except FileNotFoundError:
+            if legacy_path and os.path.exists(legacy_path):
+                # One-off import of the old whole-file JSON list
+                try:
+                    with open(legacy_path, "rb") as f:
+                        for record in orjson.loads(f.read()):
+                            self._replay(record)
+                    self._pending_updates = 1
+                    self.compact()
+                except Exception as e:
+                    logger.error(f"Could not import {legacy_path}: {e}")
+        except Exception as e:
+            logger.error(f"Could not read {path}, keeping the records replayed so far: {e}")
+
+    def _replay_file(self, path: str):
+        # Parse straight out of a read-only mapping: no copy of the whole file onto the heap
+        with open(path, "rb") as f:
+            if not os.fstat(f.fileno()).st_size:
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                view = memoryview(mm)
+                try:
+                    start, size = 0, len(mm)
+                    while start < size:
+                        end = mm.find(b"\n", start)
+                        if end == -1:
+                            end = size
+                        if end > start:
+                            self._replay(orjson.loads(view[start:end]))
+                        start = end + 1
+                finally:
+                    view.release()
+
+    def _replay(self, line: Dict):
+        if "changes" in line:
+            position = self._positions.get(line.get("order_id"))
+            if position is not None:
+                self._records[position].update(line["changes"])
+                self._pending_updates += 1
+            return
+        self._positions[line.get("order_id")] = len(self._records)
+        self._records.append(line)
+
+    def _append_lines(self, *lines: Dict):
+        payload = b"".join(orjson.dumps(line, option=JSONL_DUMP_OPTIONS) for line in lines)
+        with portalocker.Lock(self.path + ".lock", mode="a", flags=portalocker.LOCK_EX):
+            with open(self.path, "ab") as f:
+                f.write(payload)
+
+    def snapshot(self) -> List[Dict]:
+        # Records are flat (scalar fields only), so a per-record dict copy is a full copy;
+        # readers hold the lock only for that and iterate the copy outside it
+        with self._lock:
+            return [dict(record) for record in self._records]
+
+    @contextmanager
+    def locked(self):
+        """Read the records in place; persist changes with append()/update(), not by mutation."""
+        with self._lock:
+            yield self._records
+
+    def append(self, record: Dict):
+        with self._lock:
+            self._positions[record["order_id"]] = len(self._records)
+            self._records.append(record)
+            self._append_lines(record)
+
+    def update(self, position: int, changes: Dict):
+        with self._lock:
+            record = self._records[position]
+            record.update(changes)
+            self._pending_updates += 1
+            self._append_lines({"order_id": record["order_id"], "changes": changes})
+
+    def compact(self):
+        """Rewrite the file as one line per record, dropping the replayed update lines."""
+        with self._lock:
+            if not self._pending_updates:
+                return
+            payload = b"".join(orjson.dumps(record, option=JSONL_DUMP_OPTIONS) for record in self._records)
+            try:
+                atomic_write(self.path, payload)
+                self._pending_updates = 0
+            except Exception as e:
+                logger.error(f"Could not compact {self.path}: {e}")
+            self._last_compaction = time.monotonic()
+
+    def flush(self):
+        # Appends are already on disk; the shared flusher only drives compaction
+        if (time.monotonic() - self._last_compaction >= JSONL_COMPACT_INTERVAL
+                or len(self._records) + self._pending_updates > JSONL_COMPACT_RATIO * max(len(self._records), 1)):
+            self.compact()
+
+_json_stores: Dict[str, Any] = {}
+_json_stores_lock = threading.Lock()
+JSON_FLUSH_INTERVAL = float(os.getenv("JSON_FLUSH_INTERVAL", "1.0"))
+
+def _flush_json_stores():
+    for store in list(_json_stores.values()):
+        store.flush()
+
+def _json_flusher():
+    while True:
+        time.sleep(JSON_FLUSH_INTERVAL)
+        _flush_json_stores()
+
+def _get_store(path: str, factory):
+    with _json_stores_lock:
+        store = _json_stores.get(path)
+        if store is None:
+            if not _json_stores:
+                threading.Thread(target=_json_flusher, name="json-flusher", daemon=True).start()
+                atexit.register(_flush_json_stores)
+            store = _json_stores[path] = factory()
+        return store
+
+def get_json_store(path: str, default) -> WriteBackJsonFile:
+    """Process-wide write-back store for `path`, so every client and the engine share one copy."""
+    return _get_store(path, lambda: WriteBackJsonFile(path, default))
+
+def get_jsonl_log(path: str, legacy_path: Optional[str] = None) -> AppendOnlyJsonl:
+    """Process-wide append-only log for `path`; `legacy_path` is a JSON list imported once if `path` is new."""
+    return _get_store(path, lambda: AppendOnlyJsonl(path, legacy_path))
+
+PUBLIC_PRICE_TTL = float(os.getenv("PUBLIC_PRICE_TTL", "0.5"))  # seconds a client-less price lookup is reused
+_public_prices = TTLCache(ttl=PUBLIC_PRICE_TTL)
 
-@retry(stop=stop_after_attempt(3), wait=wait_fixed(2))
 def get_current_price(symbol: str) -> float:
+    # Client-less callers share one tickers request per symbol per window
+    return _public_prices.get_or(symbol, lambda: _fetch_current_price(symbol))
+
+def _fetch_current_price(symbol: str) -> float:
     try:
-        url = f"{BASE_URL}/v5/market/tickers?category=linear&symbol={symbol}"
-        response = requests.get(url).json()
+        response = get_json(f"{BASE_URL}/v5/market/tickers", params={"category": "linear", "symbol": symbol})
         if response.get("retCode") == 0:
             return float(response["result"]["list"][0]["lastPrice"])
         logger.error(f"Error getting price for {symbol}: {response.get('retMsg')}")
@@ -60,19 +358,15 @@ def get_current_price(symbol: str) -> float:
 
 def get_candles(symbol: str, interval: str, limit: int = 100) -> List[Dict]:
     try:
-        url = f"https://api.bybit.com/v5/market/kline?category=linear&symbol={symbol}&interval={interval}&limit={limit}"
-        response = requests.get(url).json()
+        params = {"category": "linear", "symbol": symbol, "interval": interval, "limit": limit}
+        response = get_json(f"{BASE_URL}/v5/market/kline", params=params)
         if response.get("retCode") == 0:
+            # Bybit sends numbers as strings; NumPy parses the whole block in one call
+            rows = [candle[:6] for candle in response.get("result", {}).get("list", [])]
+            arr = np.asarray(rows, dtype=np.float64).reshape(-1, 6)
             return [
-                {
-                    "time": int(candle[0]),
-                    "open": float(candle[1]),
-                    "high": float(candle[2]),
-                    "low": float(candle[3]),
-                    "close": float(candle[4]),
-                    "volume": float(candle[5])
-                }
-                for candle in response.get("result", {}).get("list", [])
+                {"time": int(t), "open": o, "high": h, "low": l, "close": c, "volume": v}
+                for t, o, h, l, c, v in arr.tolist()
             ]
         else:
             logger.error(f"Error fetching candles for {symbol}: {response.get('retMsg')}")
@@ -90,8 +384,8 @@ def generate_real_signals(symbols: List[str], interval: str = "60", trading_mode
             return []
         json_file = "signals.json"
         if os.path.exists(json_file):
-            with open(json_file, "r", encoding="utf-8") as f:
-                signals = json.load(f)
+            with open(json_file, "rb") as f:
+                signals = orjson.loads(f.read())
             return signals
         return []
     except subprocess.TimeoutExpired:
@@ -129,12 +423,39 @@ def format_price_safe(value: Optional[float]) -> str:
     except (ValueError, TypeError):
         return "N/A"
 
+@lru_cache(maxsize=1024)
+def _format_currency(value: float) -> str:
+    return f"{value:.2f}"
+
 def format_currency_safe(value: Optional[float]) -> str:
+    if value is None:
+        return "0.00"
     try:
-        return f"{float(value):.2f}" if value is not None else "0.00"
+        # + 0.0 folds -0.0 into 0.0: they share a cache key, so a cached "-0.00" would leak to zero
+        return _format_currency(round(float(value), 2) + 0.0)
     except (ValueError, TypeError):
         return "0.00"
 
+def get_current_price_safe(symbol: str, client) -> float:
+    """Safely get the current price for a symbol."""
+    try:
+        return client.get_current_price(symbol)
+    except Exception as e:
+        logger.error(f"Error getting price for {symbol}: {e}")
+        return 0.0
+
+def get_current_prices_safe(symbols, client) -> Dict[str, float]:
+    """Safely price several symbols with one tickers request; missing symbols map to 0.0."""
+    symbols = list(dict.fromkeys(symbols))
+    if not symbols:
+        return {}
+    try:
+        prices = client.get_current_prices_batch(symbols)
+    except Exception as e:
+        logger.error(f"Error getting prices for {len(symbols)} symbols: {e}")
+        prices = {}
+    return {symbol: prices.get(symbol, 0.0) for symbol in symbols}
+
 def ema(data: List[float], period: int) -> float:
     try:
         if not data or len(data) < period:
@@ -226,8 +547,8 @@ def classify_trend(ema9: float, ema21: float, sma20: float) -> str:
 
 def get_ticker_snapshot() -> List[Dict]:
     try:
-        url = "https://api.bybit.com/v5/market/tickers?category=linear"
-        response = requests.get(url).json()
+        url = f"{BASE_URL}/v5/market/tickers?category=linear"
+        response = orjson.loads(HTTP_SESSION.get(url, timeout=REQUEST_TIMEOUT).content)
         if response.get("retCode") == 0:
             return [
                 {
@@ -236,7 +557,7 @@ def get_ticker_snapshot() -> List[Dict]:
                     "priceChangePercent": float(ticker["price24hPcnt"]) * 100
                 }
                 for ticker in response["result"]["list"]
-                if ticker["symbol"].endswith("USDT")
+                if ticker["symbol"][-4:] == "USDT"
             ]
         return []
     except Exception as e:
@@ -253,10 +574,12 @@ def display_trades_table(trades: List[Dict], container, client=None, max_trades:
             container.info("🌙 No trades to display")
             return
 
+        # Probe the client once, not once per row
+        get_price = getattr(client, "get_current_price", None) if client else None
         trades_data = []
         for trade in trades[:max_trades]:
             symbol = trade.get("symbol", "N/A")
-            current_price = client.get_current_price(symbol) if client and hasattr(client, "get_current_price") else 0.0
+            current_price = get_price(symbol) if get_price else 0.0
             qty = float(trade.get("qty", 0))
             entry_price = float(trade.get("entry_price", 0))
             side = trade.get("side", "Buy")
@@ -319,11 +642,12 @@ def get_trades_safe(db_manager, symbol: Optional[str] = None, limit: int = 50) -
     Returns an empty list if anything goes wrong.
     """
     try:
-        if not db_manager or not hasattr(db_manager, "get_trades"):
+        get_trades = getattr(db_manager, "get_trades", None) if db_manager else None
+        if not get_trades:
             logger.error("❌ db_manager has no method 'get_trades'")
             return []
 
-        trades = db_manager.get_trades(symbol=symbol, limit=limit)
+        trades = get_trades(symbol=symbol, limit=limit)
         if not trades:
             return []
 
@@ -343,6 +667,7 @@ def get_trades_safe(db_manager, symbol: Optional[str] = None, limit: int = 50) -
                 "status": getattr(t, "status", "N/A"),
                 "timestamp": timestamp_str,
                 "virtual": getattr(t, "virtual", True),
+                "order_id": getattr(t, "order_id", None),
             })
 
         return trade_dicts